@@ -255,6 +255,65 @@ CREATE TABLE IF NOT EXISTS PIPE_MONITOR_CONFIG (
     UPDATED_AT              TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
 );
 
+-- Cost log written by the REFRESH_* procedures: one row per KPI, one row per freshness or pipe refresh
+-- (their shared statements are split across schemas / pipes by SCOPE_WEIGHTS)
+CREATE TABLE IF NOT EXISTS OBSERVABILITY_QUERY_COST_LOG (
+    LOG_ID                  VARCHAR(36) DEFAULT UUID_STRING(),
+    RUN_ID                  VARCHAR(36) NOT NULL,
+    PROCEDURE_NAME          VARCHAR(255) NOT NULL,
+    SCOPE_TYPE              VARCHAR(20) NOT NULL,  -- SCHEMA, KPI or PIPE
+    SCOPE_NAMES             ARRAY,                 -- Monitored objects sharing the cost of QUERY_IDS
+    SCOPE_WEIGHTS           ARRAY,                 -- Share of the cost per SCOPE_NAMES entry (NULL = equal split)
+    QUERY_IDS               ARRAY,
+    WAREHOUSE_NAME          VARCHAR(255),
+    ELAPSED_MS              NUMBER,
+    LOGGED_AT               TIMESTAMP_LTZ DEFAULT CURRENT_TIMESTAMP()
+);
+ALTER TABLE OBSERVABILITY_QUERY_COST_LOG ADD COLUMN IF NOT EXISTS SCOPE_WEIGHTS ARRAY;
+
+-- Warehouse seconds and bytes scanned per monitored schema / KPI / pipe
+-- (ACCOUNT_USAGE latency: falls back to measured elapsed time until QUERY_HISTORY catches up)
+CREATE OR REPLACE VIEW OBSERVABILITY_COST_BY_SCOPE AS
+WITH LOGGED_QUERIES AS (
+    SELECT l.LOG_ID, q.value::STRING AS QUERY_ID
+    FROM OBSERVABILITY_QUERY_COST_LOG l,
+         LATERAL FLATTEN(input => l.QUERY_IDS) q
+    WHERE l.LOGGED_AT >= DATEADD('day', -90, CURRENT_TIMESTAMP())
+),
+LOG_COST AS (
+    SELECT
+        lq.LOG_ID,
+        COUNT(*) AS QUERY_COUNT,
+        COUNT(qh.QUERY_ID) AS QUERIES_IN_HISTORY,
+        SUM(qh.EXECUTION_TIME) AS EXECUTION_MS,
+        SUM(qh.BYTES_SCANNED) AS BYTES_SCANNED
+    FROM LOGGED_QUERIES lq
+    LEFT JOIN SNOWFLAKE.ACCOUNT_USAGE.QUERY_HISTORY qh
+        ON qh.QUERY_ID = lq.QUERY_ID
+       AND qh.START_TIME >= DATEADD('day', -91, CURRENT_TIMESTAMP())
+    GROUP BY lq.LOG_ID
+),
+LOG_SCOPES AS (
+    SELECT l.*, s.value::STRING AS SCOPE_NAME,
+           COALESCE(l.SCOPE_WEIGHTS[s.index]::FLOAT, 1 / ARRAY_SIZE(l.SCOPE_NAMES)) AS SCOPE_WEIGHT
+    FROM OBSERVABILITY_QUERY_COST_LOG l,
+         LATERAL FLATTEN(input => l.SCOPE_NAMES) s
+    WHERE l.LOGGED_AT >= DATEADD('day', -90, CURRENT_TIMESTAMP())
+)
+SELECT
+    ls.RUN_ID,
+    ls.LOGGED_AT,
+    ls.PROCEDURE_NAME,
+    ls.SCOPE_TYPE,
+    ls.SCOPE_NAME,
+    ls.WAREHOUSE_NAME,
+    COALESCE(c.QUERY_COUNT, 0) AS QUERY_COUNT,
+    COALESCE(c.QUERIES_IN_HISTORY, 0) = COALESCE(c.QUERY_COUNT, 0) AS IS_FINAL,
+    COALESCE(NULLIF(c.EXECUTION_MS, 0), ls.ELAPSED_MS) / 1000 * ls.SCOPE_WEIGHT AS WAREHOUSE_SECONDS,
+    COALESCE(c.BYTES_SCANNED, 0) * ls.SCOPE_WEIGHT AS BYTES_SCANNED
+FROM LOG_SCOPES ls
+LEFT JOIN LOG_COST c ON c.LOG_ID = ls.LOG_ID;
+
 
 -- =============================================================================
 -- STEP 6: HELPER FUNCTIONS
@@ -269,6 +328,7 @@ $$
     var cfg = JSON.parse(CONFIG);
     var tableFilters = [];
     var fqnFilters = [];
+    var schemaScopes = [];
     
     for (var dbName in cfg) {
         var schemas = cfg[dbName];
@@ -277,16 +337,21 @@ $$
         if (schemas.length === 1 && (schemas[0] === '*' || schemas[0].toUpperCase() === 'ALL')) {
             tableFilters.push("(TABLE_CATALOG = '" + dbUpper + "')");
             fqnFilters.push("(SPLIT_PART(UPPER(f.value:objectName::STRING), '.', 1) = '" + dbUpper + "')");
+            schemaScopes.push({"scope": dbUpper + ".*", "database": dbUpper, "schema": "*"});
         } else {
             var schemaList = schemas.map(function(s) { return "'" + s.toUpperCase() + "'"; }).join(",");
             tableFilters.push("(TABLE_CATALOG = '" + dbUpper + "' AND TABLE_SCHEMA IN (" + schemaList + "))");
             fqnFilters.push("(SPLIT_PART(UPPER(f.value:objectName::STRING), '.', 1) = '" + dbUpper + "' AND SPLIT_PART(UPPER(f.value:objectName::STRING), '.', 2) IN (" + schemaList + "))");
+            schemas.forEach(function(s) {
+                schemaScopes.push({"scope": dbUpper + "." + s.toUpperCase(), "database": dbUpper, "schema": s.toUpperCase()});
+            });
         }
     }
     
     return {
         "table_filter": tableFilters.join(" OR "),
-        "fqn_filter": fqnFilters.join(" OR ")
+        "fqn_filter": fqnFilters.join(" OR "),
+        "schemas": schemaScopes
     };
 $$;
 
@@ -315,14 +380,36 @@ DECLARE
     v_filter_obj OBJECT;
     v_db_schema_delete_filter STRING;
     v_metrics_delete_filter STRING;
+    v_cost_table STRING;
+    v_run_id STRING;
+    v_started_at TIMESTAMP_LTZ;
+    v_query_ids ARRAY;
+    v_query_ids_json STRING;
+    v_schemas_json STRING;
+    v_elapsed_ms NUMBER;
+    v_prev_tag STRING;
 BEGIN
     v_daily_table := CURRENT_DATABASE() || '.' || CURRENT_SCHEMA() || '.DATA_FRESHNESS_DAILY_VOLUME';
     v_metrics_table := CURRENT_DATABASE() || '.' || CURRENT_SCHEMA() || '.DATA_FRESHNESS_TABLE_METRICS';
+    v_cost_table := CURRENT_DATABASE() || '.' || CURRENT_SCHEMA() || '.OBSERVABILITY_QUERY_COST_LOG';
     v_lookback_days := GREATEST(P_BASELINE_DAYS, 7) + 7;
-    
+    v_run_id := UUID_STRING();
+    v_started_at := CURRENT_TIMESTAMP();
+    v_query_ids := ARRAY_CONSTRUCT();
+
     v_filter_obj := BUILD_FRESHNESS_FILTERS(P_MONITOR_CONFIG);
     v_table_filter := v_filter_obj:table_filter::STRING;
     v_fqn_filter := v_filter_obj:fqn_filter::STRING;
+    v_schemas_json := TO_JSON(v_filter_obj:schemas);
+
+    -- Tag queries for cost attribution (not allowed when called from an owner's rights procedure)
+    BEGIN
+        SHOW PARAMETERS LIKE 'QUERY_TAG' IN SESSION;
+        SELECT "value" INTO :v_prev_tag FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        EXECUTE IMMEDIATE 'ALTER SESSION SET QUERY_TAG = ''{"app":"data_observability","proc":"REFRESH_DATA_FRESHNESS_TABLES","run_id":"' || v_run_id || '"}''';
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
     
     -- Build delete filter for daily_volume (uses FQN column)
     v_db_schema_delete_filter := REPLACE(v_table_filter, 'TABLE_CATALOG', 'UPPER(SPLIT_PART(FQN, ''.'', 1))');
@@ -386,6 +473,7 @@ BEGIN
     -- Delete existing data for the specified schemas only
     v_sql := 'DELETE FROM ' || v_daily_table || ' WHERE ' || v_db_schema_delete_filter;
     EXECUTE IMMEDIATE v_sql;
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
     
     -- Build delete filter for metrics table (uses DATABASE_NAME and SCHEMA_NAME columns)
     v_metrics_delete_filter := REPLACE(v_table_filter, 'TABLE_CATALOG', 'UPPER(DATABASE_NAME)');
@@ -393,6 +481,7 @@ BEGIN
     
     v_sql := 'DELETE FROM ' || v_metrics_table || ' WHERE ' || v_metrics_delete_filter;
     EXECUTE IMMEDIATE v_sql;
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
     
     -- Insert fresh data for specified schemas into daily volume
     v_sql := '
@@ -430,8 +519,9 @@ BEGIN
             ELSE ''OTHER''
         END AS DATA_SOURCES
     FROM ACCESS_HISTORY_RAW';
-    
+
     EXECUTE IMMEDIATE v_sql;
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
     
     -- Insert fresh metrics for specified schemas
     v_sql := '
@@ -571,9 +661,55 @@ BEGIN
     LEFT JOIN VOLUME_BASELINES vb ON vb.FQN = t.FQN
     LEFT JOIN YESTERDAY_VOLUME yv ON yv.FQN = t.FQN
     LEFT JOIN TODAY_VOLUME tv ON tv.FQN = t.FQN';
-    
+
     EXECUTE IMMEDIATE v_sql;
-    
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
+
+    -- Record the run in the cost log. The statements scan ACCESS_HISTORY once for every schema,
+    -- so their cost is split across schemas by each schema's share of the rows modified
+    v_query_ids_json := TO_JSON(v_query_ids);
+    v_elapsed_ms := DATEDIFF('millisecond', v_started_at, CURRENT_TIMESTAMP());
+    BEGIN
+        EXECUTE IMMEDIATE 'INSERT INTO ' || v_cost_table || ' (RUN_ID, PROCEDURE_NAME, SCOPE_TYPE, SCOPE_NAMES, SCOPE_WEIGHTS, QUERY_IDS, WAREHOUSE_NAME, ELAPSED_MS)
+            WITH SCOPES AS (
+                SELECT s.index AS IDX, s.value:scope::STRING AS SCOPE_NAME,
+                       s.value:database::STRING AS DATABASE_NAME, s.value:schema::STRING AS SCHEMA_NAME
+                FROM TABLE(FLATTEN(input => PARSE_JSON(?))) s
+            ),
+            SCOPE_ROWS AS (
+                SELECT sc.IDX, sc.SCOPE_NAME,
+                       COALESCE(SUM(d.ROWS_INSERTED + d.ROWS_UPDATED + d.ROWS_DELETED), 0) AS ROWS_MODIFIED
+                FROM SCOPES sc
+                LEFT JOIN ' || v_daily_table || ' d
+                    ON UPPER(SPLIT_PART(d.FQN, ''.'', 1)) = sc.DATABASE_NAME
+                   AND (sc.SCHEMA_NAME = ''*'' OR UPPER(SPLIT_PART(d.FQN, ''.'', 2)) = sc.SCHEMA_NAME)
+                GROUP BY sc.IDX, sc.SCOPE_NAME
+            ),
+            SCOPE_SHARES AS (
+                SELECT IDX, SCOPE_NAME, ROWS_MODIFIED / NULLIF(SUM(ROWS_MODIFIED) OVER (), 0) AS SHARE
+                FROM SCOPE_ROWS
+            )
+            SELECT ?, ''REFRESH_DATA_FRESHNESS_TABLES'', ''SCHEMA'',
+                   ARRAY_AGG(SCOPE_NAME) WITHIN GROUP (ORDER BY IDX),
+                   IFF(MAX(SHARE) IS NULL, NULL, ARRAY_AGG(SHARE) WITHIN GROUP (ORDER BY IDX)),
+                   PARSE_JSON(?), CURRENT_WAREHOUSE(), ?
+            FROM SCOPE_SHARES'
+            USING (v_schemas_json, v_run_id, v_query_ids_json, v_elapsed_ms);
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
+
+    -- Restore the caller's tag (e.g. the one set on the wizard's task)
+    BEGIN
+        IF (COALESCE(v_prev_tag, '') = '') THEN
+            ALTER SESSION UNSET QUERY_TAG;
+        ELSE
+            EXECUTE IMMEDIATE 'ALTER SESSION SET QUERY_TAG = ''' || REPLACE(v_prev_tag, '''', '''''') || '''';
+        END IF;
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
+
     RETURN 'Successfully refreshed tables at ' || CURRENT_TIMESTAMP()::STRING || 
            '. Monitoring config: ' || P_MONITOR_CONFIG ||
            '. Tables updated in: ' || CURRENT_DATABASE() || '.' || CURRENT_SCHEMA();
@@ -633,7 +769,7 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
     config_json = json.dumps(db_schemas)
     
     # This will raise an exception if refresh fails
-    session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_DATA_FRESHNESS_TABLES('{config_json}', {BASELINE_DAYS})").collect()
+    session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_DATA_FRESHNESS_TABLES(?, ?)", params=[config_json, BASELINE_DAYS]).collect()
     
     today_str = date.today().isoformat()
     
@@ -642,8 +778,8 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
         try:
             result = session.sql(f"""
                 SELECT TABLES_AFFECTED FROM {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT 
-                WHERE ALERT_DATE = CURRENT_DATE() AND ALERT_TYPE = '{alert_type}'
-            """).collect()
+                WHERE ALERT_DATE = CURRENT_DATE() AND ALERT_TYPE = ?
+            """, params=[alert_type]).collect()
             if result and result[0][0]:
                 return set(t.strip() for t in result[0][0].split(',') if t.strip())
             return set()
@@ -723,15 +859,14 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
         return msg, schema_counts
     
     def send_notification(message, integration):
-        msg_escaped = message.replace("'", "''")
         session.sql(f"""
             CALL SYSTEM$SEND_SNOWFLAKE_NOTIFICATION(
                 SNOWFLAKE.NOTIFICATION.TEXT_PLAIN(
-                    SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT('{msg_escaped}')
+                    SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT(?)
                 ),
                 SNOWFLAKE.NOTIFICATION.INTEGRATION('{integration}')
             )
-        """).collect()
+        """, params=[message]).collect()
     
     # Group issues by integration to avoid duplicate notifications
     def get_issues_by_integration(issue_list, alert_type):
@@ -766,13 +901,13 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
         fqn_list = ','.join(sorted(all_alerted))[:4000]
         critical_alert_id = f"DATA_FRESHNESS_CRITICAL_{today_str}"
         try:
-            session.sql(f"DELETE FROM {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT WHERE ALERT_ID = '{critical_alert_id}'").collect()
+            session.sql(f"DELETE FROM {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT WHERE ALERT_ID = ?", params=[critical_alert_id]).collect()
             session.sql(f"""
                 INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT 
                 (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, SCHEMAS_AFFECTED, TABLES_AFFECTED, MESSAGE_SENT) 
-                VALUES ('{critical_alert_id}', 'CRITICAL', CURRENT_DATE(), {len(all_critical_issues)}, 
-                        '{','.join(set(r["SCHEMA_NAME"] for r in all_critical_issues))[:4000]}', '{fqn_list}', 'Sent to multiple integrations')
-            """).collect()
+                VALUES (?, ?, CURRENT_DATE(), ?, ?, ?, 'Sent to multiple integrations')
+            """, params=[critical_alert_id, 'CRITICAL', len(all_critical_issues),
+                         ','.join(set(r["SCHEMA_NAME"] for r in all_critical_issues))[:4000], fqn_list]).collect()
         except:
             pass
     
@@ -795,13 +930,13 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
         fqn_list = ','.join(sorted(all_alerted))[:4000]
         warning_alert_id = f"DATA_FRESHNESS_WARNING_{today_str}"
         try:
-            session.sql(f"DELETE FROM {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT WHERE ALERT_ID = '{warning_alert_id}'").collect()
+            session.sql(f"DELETE FROM {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT WHERE ALERT_ID = ?", params=[warning_alert_id]).collect()
             session.sql(f"""
                 INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.DATA_FRESHNESS_ALERTS_SENT 
                 (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, SCHEMAS_AFFECTED, TABLES_AFFECTED, MESSAGE_SENT) 
-                VALUES ('{warning_alert_id}', 'WARNING', CURRENT_DATE(), {len(all_warning_issues)}, 
-                        '{','.join(set(r["SCHEMA_NAME"] for r in all_warning_issues))[:4000]}', '{fqn_list}', 'Sent to multiple integrations')
-            """).collect()
+                VALUES (?, ?, CURRENT_DATE(), ?, ?, ?, 'Sent to multiple integrations')
+            """, params=[warning_alert_id, 'WARNING', len(all_warning_issues),
+                         ','.join(set(r["SCHEMA_NAME"] for r in all_warning_issues))[:4000], fqn_list]).collect()
         except:
             pass
     
@@ -832,11 +967,16 @@ HANDLER = 'refresh_kpi_metrics'
 EXECUTE AS CALLER
 AS $$
 def refresh_kpi_metrics(session, P_TARGET_DB, P_TARGET_SCHEMA, P_LOOKBACK_DAYS):
+    import json
+    import time
+    import uuid
     from datetime import date, timedelta
     
     daily_table = f"{P_TARGET_DB}.{P_TARGET_SCHEMA}.KPI_DAILY_METRICS"
     summary_table = f"{P_TARGET_DB}.{P_TARGET_SCHEMA}.KPI_HEALTH_SUMMARY"
     config_table = f"{P_TARGET_DB}.{P_TARGET_SCHEMA}.KPI_CONFIG"
+    cost_table = f"{P_TARGET_DB}.{P_TARGET_SCHEMA}.OBSERVABILITY_QUERY_COST_LOG"
+    run_id = str(uuid.uuid4())
     
     # Create daily metrics table if not exists
     session.sql(f"""
@@ -857,33 +997,72 @@ def refresh_kpi_metrics(session, P_TARGET_DB, P_TARGET_SCHEMA, P_LOOKBACK_DAYS):
     insert_count = 0
     error_count = 0
     errors_detail = []
+    cost_rows = []
+    tagging = True
+    try:
+        previous_tag = session.query_tag
+    except Exception:
+        previous_tag = None
+        tagging = False
     
     for kpi in kpis:
         kpi_name = kpi['KPI_NAME']
         metric_sql = kpi['METRIC_SQL']
+        kpi_started = time.perf_counter()
         
-        for day_offset in range(int(P_LOOKBACK_DAYS) + 1):
-            result_date = date.today() - timedelta(days=(1 + day_offset))
-            result_date_str = result_date.strftime('%Y-%m-%d')
-            query_sql = metric_sql.replace('{DATE}', result_date_str)
-            
+        # Tag this KPI's queries so warehouse time can be attributed to it
+        if tagging:
             try:
-                result = session.sql(query_sql).collect()
-                metric_value = result[0][0] if result else None
+                session.query_tag = json.dumps({"app": "data_observability", "proc": "REFRESH_KPI_METRICS", "run_id": run_id, "kpi": kpi_name})
+            except Exception:
+                tagging = False
+        
+        with session.query_history() as history:
+            for day_offset in range(int(P_LOOKBACK_DAYS) + 1):
+                result_date = date.today() - timedelta(days=(1 + day_offset))
+                result_date_str = result_date.strftime('%Y-%m-%d')
+                query_sql = metric_sql.replace('{DATE}', result_date_str)
                 
-                if metric_value is not None:
-                    session.sql(f"""
-                        MERGE INTO {daily_table} t
-                        USING (SELECT '{kpi_name}' AS KPI_NAME, '{result_date_str}'::DATE AS METRIC_DATE, {metric_value} AS METRIC_VALUE) s
-                        ON t.KPI_NAME = s.KPI_NAME AND t.METRIC_DATE = s.METRIC_DATE
-                        WHEN MATCHED THEN UPDATE SET METRIC_VALUE = s.METRIC_VALUE
-                        WHEN NOT MATCHED THEN INSERT (KPI_NAME, METRIC_DATE, METRIC_VALUE) VALUES (s.KPI_NAME, s.METRIC_DATE, s.METRIC_VALUE)
-                    """).collect()
-                    insert_count += 1
-            except Exception as e:
-                error_count += 1
-                if len(errors_detail) < 3:
-                    errors_detail.append(f"{kpi_name}/{result_date_str}: {str(e)[:80]}")
+                try:
+                    result = session.sql(query_sql).collect()
+                    metric_value = result[0][0] if result else None
+                    
+                    if metric_value is not None:
+                        session.sql(f"""
+                            MERGE INTO {daily_table} t
+                            USING (SELECT '{kpi_name}' AS KPI_NAME, '{result_date_str}'::DATE AS METRIC_DATE, {metric_value} AS METRIC_VALUE) s
+                            ON t.KPI_NAME = s.KPI_NAME AND t.METRIC_DATE = s.METRIC_DATE
+                            WHEN MATCHED THEN UPDATE SET METRIC_VALUE = s.METRIC_VALUE
+                            WHEN NOT MATCHED THEN INSERT (KPI_NAME, METRIC_DATE, METRIC_VALUE) VALUES (s.KPI_NAME, s.METRIC_DATE, s.METRIC_VALUE)
+                        """).collect()
+                        insert_count += 1
+                except Exception as e:
+                    error_count += 1
+                    if len(errors_detail) < 3:
+                        errors_detail.append(f"{kpi_name}/{result_date_str}: {str(e)[:80]}")
+        
+        query_ids = [q.query_id for q in history.queries if q.query_id]
+        elapsed_ms = int((time.perf_counter() - kpi_started) * 1000)
+        cost_rows.append((run_id, kpi_name, json.dumps(query_ids), elapsed_ms))
+    
+    if tagging:
+        try:
+            session.query_tag = previous_tag
+        except Exception:
+            pass
+    
+    # Record one cost log row per KPI (best effort - never fail the refresh over it)
+    if cost_rows:
+        try:
+            placeholders = ", ".join(["(?, ?, ?, ?)"] * len(cost_rows))
+            params = [value for row in cost_rows for value in row]
+            session.sql(f"""
+                INSERT INTO {cost_table} (RUN_ID, PROCEDURE_NAME, SCOPE_TYPE, SCOPE_NAMES, QUERY_IDS, WAREHOUSE_NAME, ELAPSED_MS)
+                SELECT column1, 'REFRESH_KPI_METRICS', 'KPI', ARRAY_CONSTRUCT(column2), PARSE_JSON(column3), CURRENT_WAREHOUSE(), column4
+                FROM VALUES {placeholders}
+            """, params=params).collect()
+        except Exception:
+            pass
     
     # Create summary table with columns expected by the app
     session.sql(f"""
@@ -985,7 +1164,7 @@ def send_alert(session, P_DEFAULT_CRITICAL_INTEGRATION, P_DEFAULT_WARNING_INTEGR
     
     # Refresh KPI metrics first
     try:
-        session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_KPI_METRICS('{TARGET_DB}', '{TARGET_SCHEMA}', {LOOKBACK_DAYS})").collect()
+        session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_KPI_METRICS(?, ?, ?)", params=[TARGET_DB, TARGET_SCHEMA, LOOKBACK_DAYS]).collect()
     except:
         pass
     
@@ -1007,27 +1186,27 @@ def send_alert(session, P_DEFAULT_CRITICAL_INTEGRATION, P_DEFAULT_WARNING_INTEGR
                c.CRITICAL_INTEGRATION, c.WARNING_INTEGRATION
         FROM {TARGET_DB}.{TARGET_SCHEMA}.KPI_DAILY_METRICS m
         JOIN {TARGET_DB}.{TARGET_SCHEMA}.KPI_CONFIG c ON m.KPI_NAME = c.KPI_NAME
-        WHERE m.METRIC_DATE = '{yesterday}' AND c.IS_ENABLED = TRUE AND c.ALERT_ON_ANOMALY = TRUE
+        WHERE m.METRIC_DATE = ? AND c.IS_ENABLED = TRUE AND c.ALERT_ON_ANOMALY = TRUE
     )
     SELECT y.KPI_NAME, y.DISPLAY_NAME, y.METRIC_VALUE AS YESTERDAY_VALUE, b.BASELINE_AVG,
         y.CRITICAL_INTEGRATION, y.WARNING_INTEGRATION,
         CASE WHEN b.BASELINE_AVG = 0 THEN CASE WHEN y.METRIC_VALUE = 0 THEN 0 ELSE 100 END
              ELSE ABS((y.METRIC_VALUE - b.BASELINE_AVG) / b.BASELINE_AVG) * 100 END AS DEVIATION_PCT,
         CASE WHEN y.METRIC_VALUE > b.BASELINE_AVG THEN 'HIGHER' WHEN y.METRIC_VALUE < b.BASELINE_AVG THEN 'LOWER' ELSE 'SAME' END AS DIRECTION,
-        CASE WHEN ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= {CRITICAL_DEVIATION} THEN 'CRITICAL'
-             WHEN ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= {WARNING_DEVIATION} THEN 'WARNING'
+        CASE WHEN ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= ? THEN 'CRITICAL'
+             WHEN ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= ? THEN 'WARNING'
              WHEN y.METRIC_VALUE > b.BASELINE_AVG + (3 * b.BASELINE_STDDEV) THEN 'CRITICAL'
              WHEN y.METRIC_VALUE < b.BASELINE_AVG - (3 * b.BASELINE_STDDEV) THEN 'CRITICAL'
              WHEN y.METRIC_VALUE > b.BASELINE_AVG + (2 * b.BASELINE_STDDEV) THEN 'WARNING'
              WHEN y.METRIC_VALUE < b.BASELINE_AVG - (2 * b.BASELINE_STDDEV) THEN 'WARNING' ELSE NULL END AS ALERT_LEVEL
     FROM YESTERDAY_METRICS y JOIN KPI_BASELINE b ON y.KPI_NAME = b.KPI_NAME
-    WHERE ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= {WARNING_DEVIATION}
+    WHERE ABS((y.METRIC_VALUE - b.BASELINE_AVG) / NULLIF(b.BASELINE_AVG, 0)) * 100 >= ?
        OR y.METRIC_VALUE > b.BASELINE_AVG + (2 * b.BASELINE_STDDEV) OR y.METRIC_VALUE < b.BASELINE_AVG - (2 * b.BASELINE_STDDEV)
     ORDER BY DEVIATION_PCT DESC
     """
     
     try:
-        issues = session.sql(issues_query).collect()
+        issues = session.sql(issues_query, params=[yesterday, CRITICAL_DEVIATION, WARNING_DEVIATION, WARNING_DEVIATION]).collect()
     except Exception as e:
         return f"ERROR: {str(e)}"
     
@@ -1069,32 +1248,30 @@ def send_alert(session, P_DEFAULT_CRITICAL_INTEGRATION, P_DEFAULT_WARNING_INTEGR
         
         # Check if already sent
         try:
-            already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.KPI_ALERTS_SENT WHERE ALERT_ID = '{alert_id}'").collect()[0][0] > 0
+            already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.KPI_ALERTS_SENT WHERE ALERT_ID = ?", params=[alert_id]).collect()[0][0] > 0
             if already_sent:
                 return f"{alert_type}({integration}): already sent"
         except:
             pass
         
         message = build_message(issue_list, alert_type)
-        msg_escaped = message.replace("'", "''")
         
         try:
             session.sql(f"""
                 CALL SYSTEM$SEND_SNOWFLAKE_NOTIFICATION(
                     SNOWFLAKE.NOTIFICATION.TEXT_PLAIN(
-                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT('{msg_escaped}')
+                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT(?)
                     ),
                     SNOWFLAKE.NOTIFICATION.INTEGRATION('{integration}')
                 )
-            """).collect()
+            """, params=[message]).collect()
             
             kpis = ", ".join([row["KPI_NAME"] for row in issue_list[:20]])
             session.sql(f"""
                 INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.KPI_ALERTS_SENT 
                 (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, KPIS_AFFECTED, MESSAGE_SENT) 
-                VALUES ('{alert_id}', '{alert_type}', CURRENT_DATE(), {len(issue_list)}, 
-                        '{kpis[:4000]}', '{message[:4000].replace(chr(39), chr(39)+chr(39))}')
-            """).collect()
+                VALUES (?, ?, CURRENT_DATE(), ?, ?, ?)
+            """, params=[alert_id, alert_type, len(issue_list), kpis[:4000], message[:4000]]).collect()
             
             return f"{alert_type}({integration}): {len(issue_list)} KPI(s)"
         except Exception as e:
@@ -1131,9 +1308,29 @@ $$
 DECLARE
     v_metrics_table STRING;
     v_history_table STRING;
+    v_cost_table STRING;
+    v_run_id STRING;
+    v_started_at TIMESTAMP_LTZ;
+    v_query_ids ARRAY;
+    v_query_ids_json STRING;
+    v_elapsed_ms NUMBER;
+    v_prev_tag STRING;
 BEGIN
     v_metrics_table := P_TARGET_DB || '.' || P_TARGET_SCHEMA || '.PIPE_HEALTH_METRICS';
     v_history_table := P_TARGET_DB || '.' || P_TARGET_SCHEMA || '.PIPE_HEALTH_HISTORY';
+    v_cost_table := P_TARGET_DB || '.' || P_TARGET_SCHEMA || '.OBSERVABILITY_QUERY_COST_LOG';
+    v_run_id := UUID_STRING();
+    v_started_at := CURRENT_TIMESTAMP();
+    v_query_ids := ARRAY_CONSTRUCT();
+
+    -- Tag queries for cost attribution (not allowed when called from an owner's rights procedure)
+    BEGIN
+        SHOW PARAMETERS LIKE 'QUERY_TAG' IN SESSION;
+        SELECT "value" INTO :v_prev_tag FROM TABLE(RESULT_SCAN(LAST_QUERY_ID()));
+        EXECUTE IMMEDIATE 'ALTER SESSION SET QUERY_TAG = ''{"app":"data_observability","proc":"REFRESH_PIPE_HEALTH_TABLES","run_id":"' || v_run_id || '"}''';
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
     
     -- Create history table
     EXECUTE IMMEDIATE '
@@ -1152,6 +1349,7 @@ BEGIN
     WHERE LAST_LOAD_TIME >= DATEADD(''day'', -' || P_LOOKBACK_DAYS || ', CURRENT_DATE())
       AND PIPE_CATALOG_NAME IS NOT NULL
     GROUP BY 1, 2, 3, 4';
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
     
     -- Create metrics table
     EXECUTE IMMEDIATE '
@@ -1204,6 +1402,39 @@ BEGIN
     FROM BASELINES b
     LEFT JOIN YESTERDAY y ON b.PIPE_NAME = y.PIPE_NAME
     LEFT JOIN TODAY t ON b.PIPE_NAME = t.PIPE_NAME';
+    v_query_ids := ARRAY_APPEND(v_query_ids, LAST_QUERY_ID());
+
+    -- Record the run in the cost log. The statements are account-wide, so their cost is
+    -- split across pipes by each pipe's share of the COPY_HISTORY files it scanned
+    v_query_ids_json := TO_JSON(v_query_ids);
+    v_elapsed_ms := DATEDIFF('millisecond', v_started_at, CURRENT_TIMESTAMP());
+    BEGIN
+        EXECUTE IMMEDIATE 'INSERT INTO ' || v_cost_table || ' (RUN_ID, PROCEDURE_NAME, SCOPE_TYPE, SCOPE_NAMES, SCOPE_WEIGHTS, QUERY_IDS, WAREHOUSE_NAME, ELAPSED_MS)
+            WITH PIPE_SHARES AS (
+                SELECT PIPE_NAME, SUM(FILES_LOADED) / SUM(SUM(FILES_LOADED)) OVER () AS SHARE
+                FROM ' || v_history_table || '
+                GROUP BY PIPE_NAME
+            )
+            SELECT ?, ''REFRESH_PIPE_HEALTH_TABLES'', ''PIPE'',
+                   IFF(COUNT(*) = 0, ARRAY_CONSTRUCT(''ALL_PIPES''), ARRAY_AGG(PIPE_NAME) WITHIN GROUP (ORDER BY PIPE_NAME)),
+                   IFF(COUNT(*) = 0, NULL, ARRAY_AGG(SHARE) WITHIN GROUP (ORDER BY PIPE_NAME)),
+                   PARSE_JSON(?), CURRENT_WAREHOUSE(), ?
+            FROM PIPE_SHARES'
+            USING (v_run_id, v_query_ids_json, v_elapsed_ms);
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
+
+    -- Restore the caller's tag (e.g. the one set on the wizard's task)
+    BEGIN
+        IF (COALESCE(v_prev_tag, '') = '') THEN
+            ALTER SESSION UNSET QUERY_TAG;
+        ELSE
+            EXECUTE IMMEDIATE 'ALTER SESSION SET QUERY_TAG = ''' || REPLACE(v_prev_tag, '''', '''''') || '''';
+        END IF;
+    EXCEPTION
+        WHEN OTHER THEN NULL;
+    END;
     
     RETURN 'Refreshed pipe health metrics at ' || CURRENT_TIMESTAMP()::STRING;
 END;
@@ -1253,7 +1484,7 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
     
     # Refresh data first
     try:
-        session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_PIPE_HEALTH_TABLES('{TARGET_DB}', '{TARGET_SCHEMA}', {HISTORY_DAYS}, {LOOKBACK_DAYS}, {OUTLIER_THRESHOLD})").collect()
+        session.sql(f"CALL {TARGET_DB}.{TARGET_SCHEMA}.REFRESH_PIPE_HEALTH_TABLES(?, ?, ?, ?, ?)", params=[TARGET_DB, TARGET_SCHEMA, HISTORY_DAYS, LOOKBACK_DAYS, OUTLIER_THRESHOLD]).collect()
     except Exception as e:
         return f"ERROR: Failed to refresh: {str(e)}"
     
@@ -1262,12 +1493,12 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
     warning_alert_id = f"PIPE_HEALTH_WARNING_{today_str}"
     
     try:
-        critical_already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT WHERE ALERT_ID = '{critical_alert_id}'").collect()[0][0] > 0
+        critical_already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT WHERE ALERT_ID = ?", params=[critical_alert_id]).collect()[0][0] > 0
     except:
         critical_already_sent = False
     
     try:
-        warning_already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT WHERE ALERT_ID = '{warning_alert_id}'").collect()[0][0] > 0
+        warning_already_sent = session.sql(f"SELECT COUNT(*) FROM {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT WHERE ALERT_ID = ?", params=[warning_alert_id]).collect()[0][0] > 0
     except:
         warning_already_sent = False
     
@@ -1330,17 +1561,16 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
     if critical_issues and not critical_already_sent:
         critical_message, critical_counts = build_message(critical_issues, "CRITICAL")
         try:
-            msg_escaped = critical_message.replace("'", "''")
             session.sql(f"""
                 CALL SYSTEM$SEND_SNOWFLAKE_NOTIFICATION(
                     SNOWFLAKE.NOTIFICATION.TEXT_PLAIN(
-                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT('{msg_escaped}')
+                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT(?)
                     ),
                     SNOWFLAKE.NOTIFICATION.INTEGRATION('{CRITICAL_INTEGRATION}')
                 )
-            """).collect()
+            """, params=[critical_message]).collect()
             pipes = ", ".join([row["PIPE_NAME"] for row in critical_issues[:20]])
-            session.sql(f"INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, ISSUE_TYPES, PIPES_AFFECTED, MESSAGE_SENT) VALUES ('{critical_alert_id}', 'CRITICAL', CURRENT_DATE(), {len(critical_issues)}, '{', '.join(critical_counts.keys())[:500]}', '{pipes[:4000]}', '{critical_message[:4000].replace(chr(39), chr(39)+chr(39))}')").collect()
+            session.sql(f"INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, ISSUE_TYPES, PIPES_AFFECTED, MESSAGE_SENT) VALUES (?, 'CRITICAL', CURRENT_DATE(), ?, ?, ?, ?)", params=[critical_alert_id, len(critical_issues), ', '.join(critical_counts.keys())[:500], pipes[:4000], critical_message[:4000]]).collect()
             results.append(f"CRITICAL: {len(critical_issues)} pipe(s)")
         except Exception as e:
             results.append(f"CRITICAL failed: {str(e)[:50]}")
@@ -1348,17 +1578,16 @@ def send_alert(session, P_CRITICAL_INTEGRATION, P_WARNING_INTEGRATION):
     if warning_issues and not warning_already_sent:
         warning_message, warning_counts = build_message(warning_issues, "WARNING")
         try:
-            msg_escaped = warning_message.replace("'", "''")
             session.sql(f"""
                 CALL SYSTEM$SEND_SNOWFLAKE_NOTIFICATION(
                     SNOWFLAKE.NOTIFICATION.TEXT_PLAIN(
-                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT('{msg_escaped}')
+                        SNOWFLAKE.NOTIFICATION.SANITIZE_WEBHOOK_CONTENT(?)
                     ),
                     SNOWFLAKE.NOTIFICATION.INTEGRATION('{WARNING_INTEGRATION}')
                 )
-            """).collect()
+            """, params=[warning_message]).collect()
             pipes = ", ".join([row["PIPE_NAME"] for row in warning_issues[:20]])
-            session.sql(f"INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, ISSUE_TYPES, PIPES_AFFECTED, MESSAGE_SENT) VALUES ('{warning_alert_id}', 'WARNING', CURRENT_DATE(), {len(warning_issues)}, '{', '.join(warning_counts.keys())[:500]}', '{pipes[:4000]}', '{warning_message[:4000].replace(chr(39), chr(39)+chr(39))}')").collect()
+            session.sql(f"INSERT INTO {TARGET_DB}.{TARGET_SCHEMA}.PIPE_HEALTH_ALERTS_SENT (ALERT_ID, ALERT_TYPE, ALERT_DATE, TOTAL_ISSUES_COUNT, ISSUE_TYPES, PIPES_AFFECTED, MESSAGE_SENT) VALUES (?, 'WARNING', CURRENT_DATE(), ?, ?, ?, ?)", params=[warning_alert_id, len(warning_issues), ', '.join(warning_counts.keys())[:500], pipes[:4000], warning_message[:4000]]).collect()
             results.append(f"WARNING: {len(warning_issues)} pipe(s)")
         except Exception as e:
             results.append(f"WARNING failed: {str(e)[:50]}")
@@ -1,41 +1,118 @@
 from snowflake.snowpark.context import get_active_session
+import streamlit as st
 import pandas as pd
+import hashlib
+import json
+import threading
+import time
+import uuid
+import queries as q
 
 session = get_active_session()
 
+# Metadata changes rarely - keep it for 10 minutes unless a save invalidates it
+CACHE_TTL_SECONDS = 600
+
+# Columns with more value translations than this use an OBJECT lookup instead of a CASE chain
+VALUE_LOOKUP_THRESHOLD = 50
+
+# Dynamic Table targets refresh at most this far behind their source
+DEFAULT_TARGET_LAG = "1 hour"
+
+# How often deploy_project checks its submitted DDLs for completion
+DEPLOY_POLL_SECONDS = 0.2
+
+#METADATA CACHE___________________________________________
+@st.cache_resource
+def _metadata_cache():
+    # Shared across reruns and sessions: key tuple -> (loaded_at, DataFrame)
+    return {}
+
+@st.cache_resource
+def _metadata_lock():
+    # The cache is shared by every session, so reads and writes of the dict are serialized
+    return threading.Lock()
+
+def _cached(key, loader):
+    with _metadata_lock():
+        entry = _metadata_cache().get(key)
+    if entry is None or time.time() - entry[0] > CACHE_TTL_SECONDS:
+        # Load outside the lock: loaders prime other keys and should not block other sessions
+        entry = (time.time(), loader())
+        with _metadata_lock():
+            _metadata_cache()[key] = entry
+    # Callers add columns to the frames they get back, so never hand out the cached one
+    return entry[1].copy()
+
+def _prime(key, df):
+    # Seed a key that a parent query already loaded (prefetch of the next level down)
+    with _metadata_lock():
+        _metadata_cache()[key] = (time.time(), df.reset_index(drop=True))
+
+def invalidate(kind, *ids, where=None):
+    # Drop cached entries of a kind, optionally narrowed to the given ids or a predicate on the frame
+    with _metadata_lock():
+        cache = _metadata_cache()
+        for key in list(cache):
+            if key[0] != kind:
+                continue
+            if ids and key[1:len(ids) + 1] != ids:
+                continue
+            if where is not None and not where(cache[key][1]):
+                continue
+            del cache[key]
+
+def clear_cache():
+    with _metadata_lock():
+        _metadata_cache().clear()
+
 #GetProjects    
 def get_projects():
-    query = f"SELECT * FROM EDACONFIG.ST_EDA_VW_PROJECTS"
-    return session.sql(query).to_pandas()
+    return _cached(("projects",), lambda: q.run("projects").to_pandas())
 
 #GetSystems
 def get_systems():
-    query = f"SELECT * FROM EDACONFIG.ST_EDA_VW_SYSTEMS"
-    return session.sql(query).to_pandas()
+    return _cached(("systems",), lambda: q.run("systems").to_pandas())
 
 #GetDatabases()
 def get_databases(system):
     if system:
         id = system["ID"]
-        query = f"SELECT * FROM EDACONFIG.ST_EDA_VW_DATABASES WHERE SYSTEM_ID ='{id}'"
-        return session.sql(query).to_pandas()
+        return _cached(("databases", id), lambda: _load_databases(id))
     return pd.DataFrame()
+
+def _load_databases(systemID):
+    databases = q.run("databases", [systemID]).to_pandas()
+    # Prefetch the schemas and tables of every database in this system in the same trip;
+    # priming the schemas means _load_schemas never runs, so tables are primed here too
+    schemas = q.run("schemas_by_system", [systemID]).to_pandas()
+    tables = q.run("tables_by_system", [systemID]).to_pandas()
+    for databaseID in databases["ID"]:
+        _prime(("schemas", databaseID), schemas.loc[schemas["DATABASE_ID"] == databaseID, ["SCHEMA_ID", "NAME"]])
+    for schemaID in schemas["SCHEMA_ID"]:
+        _prime(("tables", schemaID), tables[tables["SCHEMA_ID"] == schemaID])
+    return databases
     
 #GetSchemas()
 def get_schemas(database):
     if database:
         id = database["ID"]
-        # Corrected query to reference the fully qualified table name
-        query =f"SELECT SCHEMA_ID,NAME FROM EDACONFIG.SCHEMAS WHERE DATABASE_ID = '{id}'"
-        return session.sql(query).to_pandas()
+        return _cached(("schemas", id), lambda: _load_schemas(id))
     return pd.DataFrame()
 
+def _load_schemas(databaseID):
+    schemas = q.run("schemas", [databaseID]).to_pandas()
+    # Prefetch the tables of every schema in this database in the same trip
+    tables = q.run("tables_by_database", [databaseID]).to_pandas()
+    for schemaID in schemas["SCHEMA_ID"]:
+        _prime(("tables", schemaID), tables[tables["SCHEMA_ID"] == schemaID])
+    return schemas
+
 #GetTables()
 def get_tables(schema):
     if schema:
         id=schema["SCHEMA_ID"]
-        query =f"SELECT * FROM EDACONFIG.ST_EDA_VW_GET_TABLES WHERE Schema_ID = '{id}'"
-        return session.sql(query).to_pandas()
+        return _cached(("tables", id), lambda: q.run("tables", [id]).to_pandas())
     return pd.DataFrame()
 
 #GetExistingMappings()
@@ -43,8 +120,7 @@ def get_mapping(table,project):
     if table and project:
         tableID = table["ID"]
         projectID = project["ID"]
-        query =f"SELECT * FROM EDACONFIG.ST_EDA_VW_MAPPING_MASTER WHERE SOURCE_TABLE_ID  = '{tableID}' and PROJECT_ID = '{projectID}'"
-        return session.sql(query).to_pandas()
+        return _cached(("mapping", tableID, projectID), lambda: q.run("mapping", [tableID, projectID]).to_pandas())
     return pd.DataFrame(columns=['MAPPING_ID','SOURCE','TARGET'])
 
 def get_column_mappings(mapping,df):
@@ -53,18 +129,30 @@ def get_column_mappings(mapping,df):
         selectedRow = df.loc[mapping["selection"]["rows"]].to_dict('records')
         mappingID = selectedRow[0]["MAPPING_ID"]
         tableID = selectedRow[0]['SOURCE_TABLE_ID']
-        query =f"SELECT * FROM EDACONFIG.ST_EDA_GET_COLUMN_MAPPING WHERE TABLE_ID  = '{tableID}'"
-        result_df = session.sql(query).to_pandas()
+        result_df = _cached(("columns", tableID), lambda: _load_column_mappings(tableID))
         # Add the 'IsMapped' column with default value of True
         result_df['IsMapped'] = True
         return result_df
     return pd.DataFrame(columns=['MAPPING_ID','SOURCE','TARGET'])
+
+def _load_column_mappings(tableID):
+    # The view exposes the mapping column key as ID; the editor and save path use MAPPING_COLUMN_ID
+    result_df = q.run("column_mappings", [tableID]).to_pandas().rename(columns={"ID": "MAPPING_COLUMN_ID"})
+    # Prefetch the value translations of every mapped column in the same trip
+    if not result_df.empty:
+        try:
+            values = q.run("values_by_table", [tableID]).to_pandas()
+        except Exception:
+            # Prefetch is best effort; get_mapped_values loads on demand
+            return result_df
+        for columnID in result_df["MAPPING_COLUMN_ID"]:
+            _prime(("values", columnID), values[values["MAPPING_COLUMN_ID"] == columnID])
+    return result_df
     
 def get_mapped_values(selectedCol):
-    if selectedCol and selectedCol["MAPPING_COLUMN_ID"]:
+    if selectedCol and selectedCol.get("MAPPING_COLUMN_ID"):
         id = selectedCol["MAPPING_COLUMN_ID"]
-        query = f"select * from ST_EDA_GET_TRANSLATION_VALUES WHERE MAPPING_COLUMN_ID = '{id}'"
-        return session.sql(query).toPandas()
+        return _cached(("values", id), lambda: q.run("values", [id]).to_pandas())
     else:
         result = pd.DataFrame(columns=['MAPPING_COLUMN_ID','FromValue','ToValue'])
         return result
@@ -72,8 +160,7 @@ def get_mapped_values(selectedCol):
 def get_all_columns(table):
     if table:
         id=table["TABLE_ID"]
-        query =f"SELECT Table_ID,Name FROM \"COULUMN\" WHERE Table_ID = '{id}'"
-        return session.sql(query).to_pandas()
+        return q.run("all_columns", [id]).to_pandas()
     return pd.DataFrame()
 
 #SAVE FUNCTIONS___________________________________________
@@ -83,128 +170,402 @@ def create_mapping_master(table,project,database,schema):
         tableID = table["ID"]
         databaseID = database["ID"]
         schemaID = schema["SCHEMA_ID"]
-        query = f"CALL EDACONFIG.Create_mapping_master('{projID}','{tableID}','{databaseID}','{schemaID}')"
-        return session.sql(query).collect()
+        result = q.run("create_mapping_master", [projID, tableID, databaseID, schemaID]).collect()
+        invalidate("mapping", tableID, projID)
+        return result
     return False
     
 def save_mapping_master(mappingID,db,schema,object,objectType):
     if mappingID:
-       
-        query = f"CALL update_mapping_master('{mappingID}','{db}','{schema}','{object}','{objectType}')"  
-        return session.sql(query).collect()
+        result = q.run("update_mapping_master", [mappingID, db, schema, object, objectType]).collect()
+        invalidate("mapping", where=lambda cached: (cached["MAPPING_ID"] == mappingID).any())
+        return result
     return False
     
-def save_columns(df, mappingID):
-    for index, row in df.iterrows():
-        source_column_name = row['SOURCECOLUMN']
-        target_column_name = row['TARGETCOLUMN']
-        description = row['DESCRIPTION']
-        is_mapped = row['IsMapped']
-        mapping_column_id = row['MAPPING_COLUMN_ID']
-        
-        if is_mapped and pd.isna(mapping_column_id):
-            # Insert new column mapping
-            query = f"CALL INSERT_MAPPING_COLUMN('{mappingID}', '{source_column_name}', '{target_column_name}', '{description}')"
-            session.sql(query).collect()
-        elif not pd.isna(mapping_column_id) and is_mapped == False:
-            # Delete existing column mapping
-            query = f"CALL DELETE_MAPPING_COLUMN('{mapping_column_id}')"
-            session.sql(query).collect()
-        elif not pd.isna(mapping_column_id) and is_mapped == True:
-            # Update existing column mapping
-            query = f"CALL UPDATE_MAPPING_COLUMN('{mapping_column_id}', '{target_column_name}', '{description}')"
-            session.sql(query).collect()
-    return True
-
-def preview_sql(mapping, column_df, value_df):
-    target_object_type = mapping['TARGETTYPE']
-    target_db = mapping['TARGETDB']
-    target_schema = mapping['TARGETSCHEMA']
-    target_object_name = mapping['TARGETOBJECT']
-    source_table_id = mapping['SOURCE_TABLE_ID']
-    source_table_info = session.sql(f"SELECT T.NAME, S.NAME AS SCHEMA_NAME, D.NAME AS DB_NAME FROM TABLES T JOIN SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID JOIN DATABASES D ON S.DATABASE_ID = D.DATABASE_ID WHERE T.TABLE_ID = '{source_table_id}'").to_pandas().iloc[0]
-    source_full_table_name = f"{source_table_info['DB_NAME']}.{source_table_info['SCHEMA_NAME']}.{source_table_info['NAME']}"
+def column_changes(df, original=None, changes=None):
+    # Reduce the edited column frame to the rows that must be written, tagged with OP
+    cols = ['MAPPING_COLUMN_ID','SOURCECOLUMN','TARGETCOLUMN','DESCRIPTION','IsMapped']
+    deleted = pd.DataFrame(columns=cols)
+    if changes is not None and original is not None:
+        # Data editor delta: positional row edits, appended rows and removed rows
+        edited = original.iloc[sorted(changes["edited_rows"])].copy() if changes["edited_rows"] else pd.DataFrame(columns=cols)
+        for pos, values in changes["edited_rows"].items():
+            for col, value in values.items():
+                edited.loc[original.index[pos], col] = value
+        added = pd.DataFrame(changes["added_rows"], columns=cols)
+        touched = pd.concat([edited.reindex(columns=cols), added], ignore_index=True)
+        if changes["deleted_rows"]:
+            deleted = original.iloc[changes["deleted_rows"]].reindex(columns=cols)
+    else:
+        # No delta available: diff the whole frame against what was loaded
+        touched = df.reindex(columns=cols)
+        if original is not None and not original.empty:
+            before = original.reindex(columns=cols).dropna(subset=['MAPPING_COLUMN_ID']).set_index('MAPPING_COLUMN_ID')
+            after = touched.dropna(subset=['MAPPING_COLUMN_ID']).set_index('MAPPING_COLUMN_ID')
+            deleted = before[~before.index.isin(after.index)].reset_index()
+            common = after.index.intersection(before.index)
+            same = (after.loc[common, ['TARGETCOLUMN','DESCRIPTION','IsMapped']].fillna('')
+                    == before.loc[common, ['TARGETCOLUMN','DESCRIPTION','IsMapped']].fillna('')).all(axis=1)
+            unchanged = same[same].index
+            touched = touched[~touched['MAPPING_COLUMN_ID'].isin(unchanged)]
+
+    has_id = touched['MAPPING_COLUMN_ID'].notna()
+    is_mapped = touched['IsMapped'] == True
+    touched = touched.assign(OP=None)
+    touched.loc[is_mapped & ~has_id, 'OP'] = 'INSERT'
+    touched.loc[has_id & is_mapped, 'OP'] = 'UPDATE'
+    touched.loc[has_id & (touched['IsMapped'] == False), 'OP'] = 'DELETE'
+    deleted = deleted[deleted['MAPPING_COLUMN_ID'].notna()].assign(OP='DELETE')
+    return pd.concat([touched[touched['OP'].notna()], deleted], ignore_index=True)
+
+def save_columns(df, mappingID, changes=None, original=None):
+    counts = {"inserted": 0, "updated": 0, "deleted": 0}
+    delta = column_changes(df, original, changes)
+    if delta.empty:
+        return counts
+
+    # Stage the delta once, then apply it set-based in a single transaction
+    stage = delta.rename(columns={'SOURCECOLUMN': 'SOURCE_COLUMN_NAME', 'TARGETCOLUMN': 'TARGET_COLUMN_NAME'})
+    stage = stage[['OP','MAPPING_COLUMN_ID','SOURCE_COLUMN_NAME','TARGET_COLUMN_NAME','DESCRIPTION']].astype(object)
+    stage = stage.where(stage.notna(), None)
+    stage_name = f"MAPPING_COLUMNS_STAGE_{uuid.uuid4().hex[:12].upper()}"
+    session.write_pandas(stage, stage_name, schema="EDACONFIG", auto_create_table=True,
+                         table_type="temporary", overwrite=True)
+    stage_table = f'EDACONFIG."{stage_name}"'
+
+    session.sql("BEGIN").collect()
+    try:
+        result = session.sql(f"""
+            DELETE FROM EDACONFIG.MAPPING_COLUMNS mc USING {stage_table} s
+            WHERE mc.MAPPING_COLUMN_ID = s."MAPPING_COLUMN_ID" AND s."OP" = 'DELETE' AND mc.MAPPING_ID = ?
+        """, params=[mappingID]).collect()
+        counts["deleted"] = int(result[0][0]) if result else 0
+        result = session.sql(f"""
+            MERGE INTO EDACONFIG.MAPPING_COLUMNS t
+            USING (SELECT * FROM {stage_table} WHERE "OP" IN ('INSERT','UPDATE')) s
+            ON t.MAPPING_COLUMN_ID = s."MAPPING_COLUMN_ID" AND t.MAPPING_ID = ?
+            WHEN MATCHED AND s."OP" = 'UPDATE' THEN UPDATE SET
+                TARGET_COLUMN_NAME = s."TARGET_COLUMN_NAME",
+                DESRIPTION = s."DESCRIPTION",
+                UPDATE_USER = CURRENT_USER(),
+                UPDATE_DATE_TIME = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED AND s."OP" = 'INSERT' THEN INSERT (MAPPING_ID, SOURCE_COLUMN_NAME, TARGET_COLUMN_NAME, DESRIPTION)
+                VALUES (?, s."SOURCE_COLUMN_NAME", s."TARGET_COLUMN_NAME", s."DESCRIPTION")
+        """, params=[mappingID, mappingID]).collect()
+        if result:
+            counts["inserted"] = int(result[0][0])
+            counts["updated"] = int(result[0][1])
+        session.sql("COMMIT").collect()
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+    finally:
+        session.sql(f"DROP TABLE IF EXISTS {stage_table}").collect()
 
+    # Only the column list of the edited table and the translations of its columns changed
+    for tableID in df.get('TABLE_ID', pd.Series(dtype=object)).dropna().unique():
+        invalidate("columns", tableID)
+    invalidate("columns", where=lambda cached: (cached["MAPPING_ID"] == mappingID).any())
+    for columnID in delta['MAPPING_COLUMN_ID'].dropna().unique():
+        invalidate("values", columnID)
+    return counts
+
+def sql_literal(value):
+    # Single-quoted Snowflake string literal (backslash is an escape character too)
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "''") + "'"
+
+def translation_expression(source_col, target_col, pairs, lookup_threshold=VALUE_LOOKUP_THRESHOLD):
+    # Both forms match on the column's string form, return a string, and keep the source value
+    # where the translation is NULL, so a column crossing the threshold translates exactly as before
+    if len(pairs) > lookup_threshold:
+        # Large code sets: one constant OBJECT probed by key instead of a linear WHEN chain
+        lookup, seen = {}, set()
+        for from_value, to_value in pairs:
+            # First translation wins, as it does in the CASE chain; NULL ones are left out so the key misses
+            key = str(from_value)
+            if key not in seen and not pd.isna(to_value):
+                lookup[key] = str(to_value)
+            seen.add(key)
+        lookup = json.dumps(lookup, separators=(",", ":"))
+        return f"COALESCE(GET(PARSE_JSON({sql_literal(lookup)}), {source_col}::STRING)::STRING, {source_col}::STRING) AS {target_col}"
+    case_statement = f"CASE\n"
+    for from_value, to_value in pairs:
+        result = f"{source_col}::STRING" if pd.isna(to_value) else sql_literal(to_value)
+        case_statement += f"    WHEN {source_col}::STRING = {sql_literal(from_value)} THEN {result}\n"
+    case_statement += f"    ELSE {source_col}::STRING\n"
+    case_statement += f"END AS {target_col}"
+    return case_statement
+
+def select_sql(column_df, value_df, source_full_table_name, lookup_threshold=VALUE_LOOKUP_THRESHOLD):
     select_list = []
     
     # Filter for mapped columns only
     mapped_columns = column_df[column_df['IsMapped'] == True]
+
+    # Group the value translations once for all columns
+    translations = {}
+    if not value_df.empty and {'FROMVALUE', 'TOVALUE'}.issubset(value_df.columns):
+        for column_id, group in value_df.groupby('MAPPING_COLUMN_ID', sort=False):
+            translations[column_id] = list(zip(group['FROMVALUE'], group['TOVALUE']))
     
-    for index, row in mapped_columns.iterrows():
-        source_col = row['SOURCECOLUMN']
-        target_col = row['TARGETCOLUMN']
-        
-        # Check for value translations
-        value_translation_exists = len(value_df[value_df['MAPPING_COLUMN_ID'] == row['MAPPING_COLUMN_ID']]) > 0
-        
-        if value_translation_exists:
-            case_statement = f"CASE\n"
-            for val_index, val_row in value_df[value_df['MAPPING_COLUMN_ID'] == row['MAPPING_COLUMN_ID']].iterrows():
-                case_statement += f"    WHEN {source_col} = '{val_row['FROMVALUE']}' THEN '{val_row['TOVALUE']}'\n"
-            case_statement += f"    ELSE {source_col}\n"
-            case_statement += f"END AS {target_col}"
-            select_list.append(case_statement)
+    for source_col, target_col, column_id in zip(mapped_columns['SOURCECOLUMN'], mapped_columns['TARGETCOLUMN'], mapped_columns['MAPPING_COLUMN_ID']):
+        target_col = target_col or source_col
+        pairs = translations.get(column_id)
+        if pairs:
+            select_list.append(translation_expression(source_col, target_col, pairs, lookup_threshold))
         else:
             select_list.append(f"{source_col} AS {target_col}")
 
     select_clause = ",\n".join(select_list)
-    
-    sql_statement = f"CREATE OR REPLACE {target_object_type} {target_db}.{target_schema}.{target_object_name} AS\n"
-    sql_statement += f"SELECT\n{select_clause}\nFROM {source_full_table_name};"
-    
-    return sql_statement
-
-def process_cols(columns):
-    i = 0
-    stmt = ""
-    for c in columns:
-        if i == 0:
-            stmt = "UPDATE " + tabname + " SET " + c + " = '" + columns[c] + "'"
-            i = 5
-        else:
-            stmt = stmt + ", " + c + " = '" + columns[c] + "'"
-    return stmt
-
-def select_cols (df, idx):
-    first = True
-    stmt = ""
-    cols = list(df.columns.values)
-    for col in cols:
-        if first:
-            stmt = " WHERE " + col + " = '" + str(df.iloc[idx][col]) + "'"
-            first = False
-        else:
-            if str(df.iloc[idx][col]) == 'None':
-                stmt = stmt + " AND " + col + " IS NULL "
-            else:
-                stmt = stmt + " AND " + col + " = '" + str(df.iloc[idx][col]) + "'"
-    return stmt
-
-def insert_cols(cols):
-    first = True
-    stmt = ""
-    vals = ""
-    for col in cols:
-        if first:
-            stmt = "INSERT INTO " + tabname + " ( " + col 
-            vals = " VALUES ('" + str(cols[col]) + "'"
-            first = False
-        else:
-            stmt = stmt + ", " + col 
-            vals = vals + ", '" + str(cols[col]) + "'"
-    return stmt + ") " + vals + ")"
-
-def delete_cols(idx, df):
-    first = True
-    stmt = ""
-    cols = list(df.columns.values)
-    for col in cols:
-        if first:
-            stmt = "DELETE FROM " + tabname + " WHERE " + col + " = '" + str(df.iloc[idx][col]) + "'"
-            first = False
+    return f"SELECT\n{select_clause}\nFROM {source_full_table_name}"
+
+def target_ddl(mapping, select_statement, target_lag=DEFAULT_TARGET_LAG, warehouse=None):
+    target_name = f"{mapping['TARGETDB']}.{mapping['TARGETSCHEMA']}.{mapping['TARGETOBJECT']}"
+    if str(mapping['TARGETTYPE']).upper() == "DYNAMIC TABLE":
+        # AUTO lets Snowflake pick incremental refresh for plain projections and fall back to a full
+        # refresh when a translation lookup (outer join) or a source type rules incremental out
+        warehouse = warehouse or session.get_current_warehouse()
+        sql_statement = f"CREATE OR REPLACE DYNAMIC TABLE {target_name}\n"
+        sql_statement += f"    TARGET_LAG = {sql_literal(target_lag)}\n"
+        sql_statement += f"    WAREHOUSE = {warehouse}\n"
+        sql_statement += f"    REFRESH_MODE = AUTO\n"
+        sql_statement += f"AS\n{select_statement}"
+        return sql_statement
+    return f"CREATE OR REPLACE VIEW {target_name} AS\n{select_statement}"
+
+def preview_sql(mapping, column_df, value_df, lookup_threshold=VALUE_LOOKUP_THRESHOLD, target_lag=DEFAULT_TARGET_LAG, warehouse=None):
+    source_table_id = mapping['SOURCE_TABLE_ID']
+    source_table_info = q.run("source_table", [source_table_id]).to_pandas().iloc[0]
+    source_full_table_name = f"{source_table_info['DB_NAME']}.{source_table_info['SCHEMA_NAME']}.{source_table_info['NAME']}"
+
+    select_statement = select_sql(column_df, value_df, source_full_table_name, lookup_threshold)
+    return target_ddl(mapping, select_statement, target_lag, warehouse) + ";"
+
+#DEPLOYMENT FUNCTIONS___________________________________________
+def load_project_deployment(projectID):
+    # Everything needed to generate every mapping of a project, in four queries
+    mappings = q.run("project_mappings", [projectID]).to_pandas()
+    columns = q.run("project_columns", [projectID]).to_pandas().rename(columns={"ID": "MAPPING_COLUMN_ID"})
+    columns['IsMapped'] = True
+    values = q.run("project_values", [projectID]).to_pandas()
+    deployed = q.run("project_deployed_hashes", [projectID]).to_pandas()
+    return mappings, columns, values, dict(zip(deployed['MAPPING_ID'], deployed['SQL_HASH']))
+
+def deploy_project(project, target_lag=DEFAULT_TARGET_LAG, warehouse=None, force=False):
+    projectID = project["ID"]
+    mappings, columns, values, last_hashes = load_project_deployment(projectID)
+    columns_by_mapping = dict(tuple(columns.groupby('MAPPING_ID', sort=False)))
+    value_ids = set(values['MAPPING_COLUMN_ID'])
+    warehouse = warehouse or session.get_current_warehouse()
+    batchID = str(uuid.uuid4())
+    batch_started = time.perf_counter()
+
+    report, pending = [], []
+    for mapping in mappings.to_dict('records'):
+        target = f"{mapping['TARGETDB']}.{mapping['TARGETSCHEMA']}.{mapping['TARGETOBJECT']}"
+        entry = {"MAPPING_ID": mapping['MAPPING_ID'], "SOURCE": mapping['SOURCE_FULL_NAME'], "TARGET": target,
+                 "TARGET_TYPE": mapping['TARGETTYPE'], "STATUS": None, "SECONDS": 0.0, "MESSAGE": "", "SQL_HASH": None}
+        column_df = columns_by_mapping.get(mapping['MAPPING_ID'])
+        if not (mapping['TARGETDB'] and mapping['TARGETSCHEMA'] and mapping['TARGETOBJECT']):
+            entry.update(STATUS="SKIPPED", MESSAGE="Target database, schema or object not set")
+        elif column_df is None or column_df.empty:
+            entry.update(STATUS="SKIPPED", MESSAGE="No mapped columns")
         else:
-            if str(df.iloc[idx][col]) == 'None':
-                stmt = stmt + " AND " + col + " IS NULL "
+            value_df = values[values['MAPPING_COLUMN_ID'].isin(set(column_df['MAPPING_COLUMN_ID']) & value_ids)]
+            ddl = target_ddl(mapping, select_sql(column_df, value_df, mapping['SOURCE_FULL_NAME']), target_lag, warehouse)
+            entry["SQL_HASH"] = hashlib.sha256(ddl.encode("utf-8")).hexdigest()
+            if not force and last_hashes.get(mapping['MAPPING_ID']) == entry["SQL_HASH"]:
+                entry.update(STATUS="UNCHANGED")
             else:
-                stmt = stmt + " AND " + col + " = '" + str(df.iloc[idx][col]) + "'"
-    return stmt
+                # Submit without waiting so every target's DDL runs concurrently
+                started = time.perf_counter()
+                try:
+                    pending.append((entry, session.sql(ddl).collect_nowait(), started))
+                except Exception as e:
+                    entry.update(STATUS="FAILED", MESSAGE=str(e)[:1000], SECONDS=round(time.perf_counter() - started, 2))
+        report.append(entry)
+
+    # Poll the submitted DDLs and timestamp each one as it finishes, so SECONDS is that job's own time
+    while pending:
+        running = []
+        for entry, job, started in pending:
+            if not job.is_done():
+                running.append((entry, job, started))
+                continue
+            entry["SECONDS"] = round(time.perf_counter() - started, 2)
+            try:
+                job.result()
+                entry.update(STATUS="DEPLOYED")
+            except Exception as e:
+                entry.update(STATUS="FAILED", MESSAGE=str(e)[:1000])
+        pending = running
+        if pending:
+            time.sleep(DEPLOY_POLL_SECONDS)
+    elapsed = round(time.perf_counter() - batch_started, 2)
+
+    # Log the attempts and flag the published mappings in one statement each
+    attempted = [r for r in report if r["STATUS"] in ("DEPLOYED", "FAILED")]
+    if attempted:
+        q.run_many("log_deployments", [[batchID, r["MAPPING_ID"], r["TARGET"], r["TARGET_TYPE"], r["SQL_HASH"], r["STATUS"], r["MESSAGE"], int(r["SECONDS"] * 1000)]
+                                       for r in attempted])
+    published = [r["MAPPING_ID"] for r in report if r["STATUS"] == "DEPLOYED"]
+    if published:
+        q.run("publish_mappings", [json.dumps(published)]).collect()
+        invalidate("mapping", where=lambda cached: cached["MAPPING_ID"].isin(published).any())
+
+    # Per-mapping report plus the batch's wall-clock seconds (the DDLs overlap, so SECONDS does not add up)
+    return pd.DataFrame(report, columns=["MAPPING_ID","SOURCE","TARGET","TARGET_TYPE","STATUS","SECONDS","MESSAGE","SQL_HASH"]), elapsed
+
+#IMPORT FUNCTIONS___________________________________________
+IMPORT_COLUMNS = ['PROJECT','SOURCE_TABLE','SOURCE_COLUMN','TARGET_COLUMN','DESCRIPTION','VALUE_TRANSLATIONS']
+
+def read_import_file(uploaded_file):
+    # CSV or Parquet with IMPORT_COLUMNS; SOURCE_TABLE is DATABASE.SCHEMA.TABLE, VALUE_TRANSLATIONS a JSON object
+    if uploaded_file.name.lower().endswith(".parquet"):
+        df = pd.read_parquet(uploaded_file)
+    else:
+        df = pd.read_csv(uploaded_file, dtype=str, keep_default_na=False)
+    df.columns = [c.strip().upper() for c in df.columns]
+    return df.reindex(columns=IMPORT_COLUMNS).fillna('').astype(str)
+
+def load_import_catalog():
+    # Cached like the rest of the metadata, so reruns while reviewing a file don't reload it
+    projects = _cached(("catalog", "projects"), lambda: q.run("catalog_projects").to_pandas())
+    tables = _cached(("catalog", "tables"), lambda: q.run("catalog_tables").to_pandas())
+    columns = _cached(("catalog", "columns"), lambda: q.run("catalog_columns").to_pandas())
+    return projects, tables, columns
+
+def _parse_translations(text):
+    if not text.strip():
+        return {}
+    value = json.loads(text)
+    if not isinstance(value, dict):
+        raise ValueError("not a JSON object")
+    return value
+
+def validate_import(df):
+    # One pass of joins against the catalog; returns (resolved rows, value translations, errors)
+    projects, tables, columns = load_import_catalog()
+    rows = df.copy()
+    rows['ROW'] = rows.index + 1
+    for col in ['PROJECT','SOURCE_TABLE','SOURCE_COLUMN','TARGET_COLUMN']:
+        rows[col] = rows[col].str.strip()
+    rows['TARGET_COLUMN'] = rows['TARGET_COLUMN'].where(rows['TARGET_COLUMN'] != '', rows['SOURCE_COLUMN'])
+    rows['PROJECT_KEY'] = rows['PROJECT'].str.upper()
+    rows['TABLE_KEY'] = rows['SOURCE_TABLE'].str.upper()
+    rows['COLUMN_KEY'] = rows['SOURCE_COLUMN'].str.upper()
+    rows['TARGET_KEY'] = rows['TARGET_COLUMN'].str.upper()
+
+    rows = rows.merge(projects, on='PROJECT_KEY', how='left')
+    rows = rows.merge(tables, on='TABLE_KEY', how='left')
+    rows = rows.merge(columns, on=['TABLE_ID','COLUMN_KEY'], how='left')
+
+    checks = [
+        (rows['PROJECT_ID'].isna(), "Unknown project"),
+        (rows['TABLE_ID'].isna(), "Unknown source table"),
+        (rows['TABLE_ID'].notna() & rows['COLUMN_NAME'].isna(), "Unknown source column"),
+        (rows.duplicated(['PROJECT_KEY','TABLE_KEY','COLUMN_KEY'], keep=False), "Duplicate source column"),
+        (rows.duplicated(['PROJECT_KEY','TABLE_KEY','TARGET_KEY'], keep=False), "Duplicate target column"),
+    ]
+
+    # Targets already mapped in the catalog (not cached: mappings change while a file is reviewed).
+    # Columns the file maps again are overwritten by the import, so only the others can clash
+    existing = q.run("catalog_targets").to_pandas()
+    resolved = rows.loc[rows['PROJECT_ID'].notna() & rows['TABLE_ID'].notna(), ['PROJECT_ID','TABLE_ID','COLUMN_KEY','TARGET_KEY']]
+    taken = pd.Series(False, index=rows.index)
+    if not existing.empty and not resolved.empty:
+        resolved = resolved.astype({'PROJECT_ID': existing['PROJECT_ID'].dtype, 'TABLE_ID': existing['TABLE_ID'].dtype})
+        existing = existing.merge(resolved[['PROJECT_ID','TABLE_ID','COLUMN_KEY']].drop_duplicates(), how='left', indicator=True)
+        existing = existing.loc[existing['_merge'] == 'left_only', ['PROJECT_ID','TABLE_ID','TARGET_KEY']].drop_duplicates()
+        taken.loc[resolved.reset_index().merge(existing, on=['PROJECT_ID','TABLE_ID','TARGET_KEY'])['index']] = True
+    checks.append((taken, "Target column already mapped"))
+    # Store the column name as the catalog spells it
+    rows['SOURCE_COLUMN'] = rows['COLUMN_NAME'].fillna(rows['SOURCE_COLUMN'])
+
+    translations = {}
+    bad_json = pd.Series(False, index=rows.index)
+    for i, text in rows.loc[rows['VALUE_TRANSLATIONS'].str.strip() != '', 'VALUE_TRANSLATIONS'].items():
+        try:
+            translations[i] = _parse_translations(text)
+        except ValueError:
+            bad_json[i] = True
+    checks.append((bad_json, "VALUE_TRANSLATIONS is not a JSON object"))
+
+    errors = pd.concat([rows.loc[mask, ['ROW','PROJECT','SOURCE_TABLE','SOURCE_COLUMN','TARGET_COLUMN']].assign(ERROR=message)
+                        for mask, message in checks if mask.any()] or [pd.DataFrame(columns=['ROW','ERROR'])], ignore_index=True)
+
+    values = pd.DataFrame([(i, str(k), None if v is None else str(v)) for i, pairs in translations.items() for k, v in pairs.items()],
+                          columns=['ROW_INDEX','FROM_VALUE','TO_VALUE'])
+    values = values.merge(rows[['PROJECT_ID','TABLE_ID','SOURCE_COLUMN']], left_on='ROW_INDEX', right_index=True).drop(columns=['ROW_INDEX'])
+    rows['HAS_TRANSLATIONS'] = rows['VALUE_TRANSLATIONS'].str.strip() != ''
+    return rows, values, errors.sort_values('ROW')
+
+def import_mappings(rows, values):
+    # Staged, set-based load: missing masters, merged columns, replaced value translations
+    counts = {"mappings": 0, "columns_inserted": 0, "columns_updated": 0, "values": 0}
+    suffix = uuid.uuid4().hex[:12].upper()
+    column_stage = f"IMPORT_COLUMNS_STAGE_{suffix}"
+    value_stage = f"IMPORT_VALUES_STAGE_{suffix}"
+    stage_rows = rows[['PROJECT_ID','TABLE_ID','DATABASE_ID','SCHEMA_ID','SOURCE_COLUMN','TARGET_COLUMN','DESCRIPTION','HAS_TRANSLATIONS']].astype(object)
+    session.write_pandas(stage_rows, column_stage, schema="EDACONFIG", auto_create_table=True, table_type="temporary", overwrite=True)
+    if not values.empty:
+        session.write_pandas(values.astype(object), value_stage, schema="EDACONFIG", auto_create_table=True, table_type="temporary", overwrite=True)
+    column_stage = f'EDACONFIG."{column_stage}"'
+    value_stage = f'EDACONFIG."{value_stage}"'
+
+    # The earliest mapping of a project/table pair receives the imported columns
+    target_mapping = f"""
+        SELECT s.*, m.MAPPING_ID FROM {column_stage} s
+        JOIN EDACONFIG.MAPPING_MASTER m ON m.PROJECT_ID = s."PROJECT_ID" AND m.SOURCE_TABLE_ID = s."TABLE_ID"
+        QUALIFY ROW_NUMBER() OVER (PARTITION BY s."PROJECT_ID", s."TABLE_ID", s."SOURCE_COLUMN" ORDER BY m.INSERT_DATE_TIME, m.MAPPING_ID) = 1
+    """
+    session.sql("BEGIN").collect()
+    try:
+        result = session.sql(f"""
+            INSERT INTO EDACONFIG.MAPPING_MASTER (PROJECT_ID, SOURCE_TABLE_ID, SOURCE_DATABASE_ID, SOURCE_SCHEMA_ID)
+            SELECT DISTINCT s."PROJECT_ID", s."TABLE_ID", s."DATABASE_ID", s."SCHEMA_ID" FROM {column_stage} s
+            WHERE NOT EXISTS (SELECT 1 FROM EDACONFIG.MAPPING_MASTER m WHERE m.PROJECT_ID = s."PROJECT_ID" AND m.SOURCE_TABLE_ID = s."TABLE_ID")
+        """).collect()
+        counts["mappings"] = int(result[0][0]) if result else 0
+        result = session.sql(f"""
+            MERGE INTO EDACONFIG.MAPPING_COLUMNS t
+            USING ({target_mapping}) s
+            ON t.MAPPING_ID = s.MAPPING_ID AND t.SOURCE_COLUMN_NAME = s."SOURCE_COLUMN"
+            WHEN MATCHED THEN UPDATE SET
+                TARGET_COLUMN_NAME = s."TARGET_COLUMN",
+                DESRIPTION = s."DESCRIPTION",
+                UPDATE_USER = CURRENT_USER(),
+                UPDATE_DATE_TIME = CURRENT_TIMESTAMP()
+            WHEN NOT MATCHED THEN INSERT (MAPPING_ID, SOURCE_COLUMN_NAME, TARGET_COLUMN_NAME, DESRIPTION, PROJECT_ID)
+                VALUES (s.MAPPING_ID, s."SOURCE_COLUMN", s."TARGET_COLUMN", s."DESCRIPTION", s."PROJECT_ID")
+        """).collect()
+        if result:
+            counts["columns_inserted"] = int(result[0][0])
+            counts["columns_updated"] = int(result[0][1])
+        # Rows that carry translations replace the column's existing ones
+        session.sql(f"""
+            DELETE FROM EDACONFIG.MAPPING_VALUES v USING ({target_mapping}) s, EDACONFIG.MAPPING_COLUMNS c
+            WHERE s."HAS_TRANSLATIONS" AND c.MAPPING_ID = s.MAPPING_ID AND c.SOURCE_COLUMN_NAME = s."SOURCE_COLUMN"
+              AND v.MAPPING_COLUMN_ID = c.MAPPING_COLUMN_ID
+        """).collect()
+        if not values.empty:
+            result = session.sql(f"""
+                INSERT INTO EDACONFIG.MAPPING_VALUES (MAPPING_COLUMN_ID, FROM_VALUE, TO_VALUE)
+                SELECT c.MAPPING_COLUMN_ID, v."FROM_VALUE", v."TO_VALUE"
+                FROM {value_stage} v
+                JOIN ({target_mapping}) s ON s."PROJECT_ID" = v."PROJECT_ID" AND s."TABLE_ID" = v."TABLE_ID" AND s."SOURCE_COLUMN" = v."SOURCE_COLUMN"
+                JOIN EDACONFIG.MAPPING_COLUMNS c ON c.MAPPING_ID = s.MAPPING_ID AND c.SOURCE_COLUMN_NAME = s."SOURCE_COLUMN"
+            """).collect()
+            counts["values"] = int(result[0][0]) if result else 0
+        session.sql("COMMIT").collect()
+    except Exception:
+        session.sql("ROLLBACK").collect()
+        raise
+    finally:
+        session.sql(f"DROP TABLE IF EXISTS {column_stage}").collect()
+        session.sql(f"DROP TABLE IF EXISTS {value_stage}").collect()
+
+    # A bulk import touches mappings across many tables
+    for kind in ("mapping", "columns", "values"):
+        invalidate(kind)
+    return counts
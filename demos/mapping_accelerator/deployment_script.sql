@@ -136,6 +136,34 @@ CREATE OR REPLACE TABLE MAPPING_COLUMNS (
 	PRIMARY KEY (MAPPING_COLUMN_ID)
 );
 
+CREATE OR REPLACE TABLE MAPPING_VALUES (
+	MAPPING_VALUE_ID VARCHAR(36) NOT NULL DEFAULT UUID_STRING(),
+	MAPPING_COLUMN_ID VARCHAR(36) NOT NULL,
+	FROM_VALUE VARCHAR(255),
+	TO_VALUE VARCHAR(255),
+	INSERT_USER VARCHAR(50) DEFAULT CURRENT_USER(),
+	INSERT_DATE_TIME TIMESTAMP_NTZ(9) DEFAULT CURRENT_TIMESTAMP(),
+	UPDATE_USER VARCHAR(50),
+	UPDATE_DATE_TIME TIMESTAMP_NTZ(9),
+	PRIMARY KEY (MAPPING_VALUE_ID)
+);
+
+-- Deployment log: one row per deployed mapping, SQL_HASH lets unchanged mappings be skipped
+CREATE OR REPLACE TABLE MAPPING_DEPLOYMENTS (
+	DEPLOYMENT_ID VARCHAR(36) NOT NULL DEFAULT UUID_STRING(),
+	BATCH_ID VARCHAR(36) NOT NULL,
+	MAPPING_ID VARCHAR(36) NOT NULL,
+	TARGET_OBJECT VARCHAR(500),
+	TARGET_TYPE VARCHAR(20),
+	SQL_HASH VARCHAR(64),
+	STATUS VARCHAR(20),
+	MESSAGE VARCHAR(1000),
+	DEPLOY_MS NUMBER,
+	DEPLOY_USER VARCHAR(50) DEFAULT CURRENT_USER(),
+	DEPLOY_DATE_TIME TIMESTAMP_NTZ(9) DEFAULT CURRENT_TIMESTAMP(),
+	PRIMARY KEY (DEPLOYMENT_ID)
+);
+
 -- 8. Create views (depend on tables)
 CREATE OR REPLACE VIEW ST_EDA_VW_SYSTEMS(
 	ID,
@@ -228,8 +256,8 @@ dbSource.Name || '.' || ssource.Name || '.' || tsource.Name AS Source,
 dbtarget.name || '.' || starget.Name || '.' || mm.destination_object_name AS Target,
 mm.destination_object_type AS TargetType,
 mm.is_published,
-dbtarget.NAME AS TARGETDB,
-Starget.Name AS TARGETSCHEMA,
+COALESCE(dbtarget.NAME, mm.destination_database_id) AS TARGETDB,
+COALESCE(Starget.Name, mm.destination_schema_id) AS TARGETSCHEMA,
 mm.destination_object_name AS TARGETOBJECT
 FROM Mapping_master mm
 LEFT JOIN DATABASES DbSource ON mm.source_database_id = DBSOURCE.DATABASE_ID
@@ -238,6 +266,15 @@ LEFT JOIN SCHEMAS SSource ON mm.source_SCHEMA_ID = ssource.SCHEMA_ID
 LEFT JOIN DATABASES DbTarget ON mm.destination_database_id = DBtarget.DATABASE_ID
 LEFT JOIN SCHEMAS STarget ON mm.destination_SCHEMA_ID = starget.SCHEMA_ID;
 
+CREATE OR REPLACE VIEW ST_EDA_GET_TRANSLATION_VALUES(
+	MAPPING_VALUE_ID,
+	MAPPING_COLUMN_ID,
+	FROMVALUE,
+	TOVALUE
+) AS
+SELECT MAPPING_VALUE_ID, MAPPING_COLUMN_ID, FROM_VALUE AS FROMVALUE, TO_VALUE AS TOVALUE
+FROM EDACONFIG.MAPPING_VALUES;
+
 -- 9. Create stored procedures
 CREATE OR REPLACE PROCEDURE "CREATE_MAPPING_MASTER"("PROJECTID" VARCHAR, "SOURCETABLE" VARCHAR)
 RETURNS BOOLEAN
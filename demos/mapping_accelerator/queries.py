@@ -0,0 +1,100 @@
+from snowflake.snowpark.context import get_active_session
+
+session = get_active_session()
+
+# Rows per multi-row INSERT issued by run_many
+BATCH_ROWS = 500
+
+#NAMED STATEMENTS___________________________________________
+# Every value is bound with ?, so a statement's text never changes between calls:
+# Snowflake can reuse its compiled plan and serve repeated lookups from the result cache.
+STATEMENTS = {
+    "projects": "SELECT * FROM EDACONFIG.ST_EDA_VW_PROJECTS",
+    "systems": "SELECT * FROM EDACONFIG.ST_EDA_VW_SYSTEMS",
+    "databases": "SELECT * FROM EDACONFIG.ST_EDA_VW_DATABASES WHERE SYSTEM_ID = ?",
+    "schemas_by_system": """SELECT S.DATABASE_ID, S.SCHEMA_ID, S.NAME FROM EDACONFIG.SCHEMAS S
+                            JOIN EDACONFIG.DATABASES D ON S.DATABASE_ID = D.DATABASE_ID
+                            WHERE D.SYSTEM_ID = ?""",
+    "schemas": "SELECT SCHEMA_ID, NAME FROM EDACONFIG.SCHEMAS WHERE DATABASE_ID = ?",
+    "tables_by_database": """SELECT T.* FROM EDACONFIG.ST_EDA_VW_GET_TABLES T
+                             JOIN EDACONFIG.SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID
+                             WHERE S.DATABASE_ID = ?""",
+    "tables_by_system": """SELECT T.* FROM EDACONFIG.ST_EDA_VW_GET_TABLES T
+                           JOIN EDACONFIG.SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID
+                           JOIN EDACONFIG.DATABASES D ON S.DATABASE_ID = D.DATABASE_ID
+                           WHERE D.SYSTEM_ID = ?""",
+    "tables": "SELECT * FROM EDACONFIG.ST_EDA_VW_GET_TABLES WHERE SCHEMA_ID = ?",
+    "mapping": "SELECT * FROM EDACONFIG.ST_EDA_VW_MAPPING_MASTER WHERE SOURCE_TABLE_ID = ? AND PROJECT_ID = ?",
+    "column_mappings": "SELECT * FROM EDACONFIG.ST_EDA_GET_COLUMN_MAPPING WHERE TABLE_ID = ?",
+    "values_by_table": """SELECT V.* FROM ST_EDA_GET_TRANSLATION_VALUES V
+                          JOIN EDACONFIG.ST_EDA_GET_COLUMN_MAPPING C ON V.MAPPING_COLUMN_ID = C.ID
+                          WHERE C.TABLE_ID = ?""",
+    "values": "SELECT * FROM ST_EDA_GET_TRANSLATION_VALUES WHERE MAPPING_COLUMN_ID = ?",
+    "all_columns": "SELECT Table_ID, Name FROM \"COULUMN\" WHERE Table_ID = ?",
+    "source_table": """SELECT T.NAME, S.NAME AS SCHEMA_NAME, D.NAME AS DB_NAME FROM TABLES T
+                       JOIN SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID
+                       JOIN DATABASES D ON S.DATABASE_ID = D.DATABASE_ID
+                       WHERE T.TABLE_ID = ?""",
+    "create_mapping_master": "CALL EDACONFIG.Create_mapping_master(?, ?, ?, ?)",
+    "update_mapping_master": "CALL update_mapping_master(?, ?, ?, ?, ?)",
+
+    # Project deployment
+    "project_mappings": """SELECT M.*, D.NAME || '.' || S.NAME || '.' || T.NAME AS SOURCE_FULL_NAME
+                           FROM EDACONFIG.ST_EDA_VW_MAPPING_MASTER M
+                           JOIN EDACONFIG.TABLES T ON M.SOURCE_TABLE_ID = T.TABLE_ID
+                           JOIN EDACONFIG.SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID
+                           JOIN EDACONFIG.DATABASES D ON S.DATABASE_ID = D.DATABASE_ID
+                           WHERE M.PROJECT_ID = ?""",
+    "project_columns": """SELECT C.* FROM EDACONFIG.ST_EDA_GET_COLUMN_MAPPING C
+                          JOIN EDACONFIG.MAPPING_MASTER M ON C.MAPPING_ID = M.MAPPING_ID
+                          WHERE M.PROJECT_ID = ?""",
+    "project_values": """SELECT V.* FROM EDACONFIG.ST_EDA_GET_TRANSLATION_VALUES V
+                         JOIN EDACONFIG.MAPPING_COLUMNS C ON V.MAPPING_COLUMN_ID = C.MAPPING_COLUMN_ID
+                         JOIN EDACONFIG.MAPPING_MASTER M ON C.MAPPING_ID = M.MAPPING_ID
+                         WHERE M.PROJECT_ID = ?""",
+    "project_deployed_hashes": """SELECT D.MAPPING_ID, D.SQL_HASH FROM EDACONFIG.MAPPING_DEPLOYMENTS D
+                                  JOIN EDACONFIG.MAPPING_MASTER M ON D.MAPPING_ID = M.MAPPING_ID
+                                  WHERE M.PROJECT_ID = ? AND D.STATUS = 'DEPLOYED'
+                                  QUALIFY ROW_NUMBER() OVER (PARTITION BY D.MAPPING_ID ORDER BY D.DEPLOY_DATE_TIME DESC) = 1""",
+    # The id list travels as one JSON array bind, so the text is the same for any number of mappings
+    "publish_mappings": """UPDATE EDACONFIG.MAPPING_MASTER SET IS_PUBLISHED = TRUE, UPDATE_USER = CURRENT_USER(), UPDATE_DATE_TIME = CURRENT_TIMESTAMP()
+                           WHERE MAPPING_ID IN (SELECT f.VALUE::STRING FROM TABLE(FLATTEN(PARSE_JSON(?))) f)""",
+
+    # Bulk import catalog
+    "catalog_projects": "SELECT ID AS PROJECT_ID, UPPER(NAME) AS PROJECT_KEY FROM EDACONFIG.ST_EDA_VW_PROJECTS",
+    "catalog_tables": """SELECT T.ID AS TABLE_ID, T.SCHEMA_ID, S.DATABASE_ID, UPPER(D.NAME || '.' || S.NAME || '.' || T.NAME) AS TABLE_KEY
+                         FROM EDACONFIG.ST_EDA_VW_GET_TABLES T
+                         JOIN EDACONFIG.SCHEMAS S ON T.SCHEMA_ID = S.SCHEMA_ID
+                         JOIN EDACONFIG.DATABASES D ON S.DATABASE_ID = D.DATABASE_ID""",
+    "catalog_columns": "SELECT TABLE_ID, NAME AS COLUMN_NAME, UPPER(NAME) AS COLUMN_KEY FROM EDACONFIG.COLUMNS",
+    # Mapped targets of the earliest mapping per project/table, the one an import writes into
+    "catalog_targets": """SELECT M.PROJECT_ID, M.SOURCE_TABLE_ID AS TABLE_ID, UPPER(C.SOURCECOLUMN) AS COLUMN_KEY,
+                                 UPPER(COALESCE(NULLIF(C.TARGETCOLUMN, ''), C.SOURCECOLUMN)) AS TARGET_KEY
+                          FROM EDACONFIG.ST_EDA_GET_COLUMN_MAPPING C
+                          JOIN EDACONFIG.MAPPING_MASTER M ON C.MAPPING_ID = M.MAPPING_ID
+                          WHERE C."IsMapped"
+                          QUALIFY DENSE_RANK() OVER (PARTITION BY M.PROJECT_ID, M.SOURCE_TABLE_ID ORDER BY M.INSERT_DATE_TIME, M.MAPPING_ID) = 1""",
+}
+
+# Multi-row writes: statement prefix and the placeholder group repeated once per row
+BATCH_STATEMENTS = {
+    "log_deployments": ("INSERT INTO EDACONFIG.MAPPING_DEPLOYMENTS (BATCH_ID, MAPPING_ID, TARGET_OBJECT, TARGET_TYPE, SQL_HASH, STATUS, MESSAGE, DEPLOY_MS) VALUES ",
+                        "(?, ?, ?, ?, ?, ?, ?, ?)"),
+}
+
+def run(name, params=None):
+    # Snowpark DataFrame for a named statement; callers collect() or to_pandas() it
+    return session.sql(STATEMENTS[name], params=list(params) if params is not None else None)
+
+def run_many(name, rows, batch_rows=BATCH_ROWS):
+    # executemany-style binding: one multi-row statement per batch_rows rows, returns rows written
+    prefix, group = BATCH_STATEMENTS[name]
+    rows = [list(row) for row in rows]
+    written = 0
+    for start in range(0, len(rows), batch_rows):
+        chunk = rows[start:start + batch_rows]
+        # Full batches share one statement text; only the final partial batch differs
+        query = prefix + ", ".join([group] * len(chunk))
+        result = session.sql(query, params=[value for row in chunk for value in row]).collect()
+        written += int(result[0][0]) if result else 0
+    return written
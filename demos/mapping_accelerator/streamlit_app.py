@@ -6,8 +6,9 @@ import data_access as da
 # Get the current credentials from the Streamlit app's environment
 session = get_active_session()
 
-# Add the data_access.py file as a session import so it can be used
+# Add the data_access.py and queries.py files as session imports so they can be used
 # by the app's functions. This is required for Snowflake Streamlit apps.
+session.add_import("queries.py","queries")
 session.add_import("data_access.py","data_access")
 
 # Configure the Streamlit page, setting the layout to wide and the page title.
@@ -185,6 +186,8 @@ with st.sidebar:
     currentSchema = st.selectbox("Select a Schema",schemaList,format_func=lambda x:x["NAME"],key="schemaSelect")  
     currentTable = st.selectbox("Select a Table",tableList, format_func=lambda x:x["NAME"],key="tableSelect")
     st.button('Reset Filters',on_click=resetFilters)
+    # Metadata is cached in data_access; pick up catalog changes made outside the app
+    st.button('Refresh Metadata',on_click=da.clear_cache)
        
 st.header("EDA Custom Mapping")
 masterList = st.session_state["masterList"]
@@ -220,6 +223,47 @@ with st.expander('MAPPING LIST',expanded=not mappingSelected):
                     st.session_state["newMapping"] = True  
                     st.rerun()
                     
+# This expander deploys every mapping of the selected project in one batch.
+if currentProject:
+    with st.expander('PROJECT DEPLOYMENT',expanded=False):
+        with st.form(key="deployForm"):
+            st.caption("Generates the target View or Dynamic Table for every mapping in the project. Mappings whose generated SQL is unchanged since their last deployment are skipped.")
+            deployCol1, deployCol2 = st.columns(2)
+            with deployCol1:
+                targetLag = st.text_input("Dynamic Table Target Lag", da.DEFAULT_TARGET_LAG)
+            with deployCol2:
+                deployWarehouse = st.text_input("Dynamic Table Warehouse", session.get_current_warehouse() or "")
+            forceDeploy = st.checkbox("Redeploy unchanged mappings")
+            if st.form_submit_button("Deploy All Mappings"):
+                with st.spinner("Deploying mappings..."):
+                    report, deploySeconds = da.deploy_project(currentProject, targetLag, deployWarehouse or None, forceDeploy)
+                statusCounts = report["STATUS"].value_counts()
+                st.success(f"Deployed {statusCounts.get('DEPLOYED', 0)}, unchanged {statusCounts.get('UNCHANGED', 0)}, skipped {statusCounts.get('SKIPPED', 0)}, failed {statusCounts.get('FAILED', 0)} in {deploySeconds:.1f}s.")
+                st.dataframe(report, use_container_width=True, hide_index=True,
+                             column_config={"MAPPING_ID": None, "SQL_HASH": None,
+                                            "SECONDS": st.column_config.NumberColumn("Deploy Time (s)", format="%.2f")})
+
+# This expander loads column mappings for many tables at once from a file.
+with st.expander('BULK IMPORT',expanded=False):
+    st.caption("CSV or Parquet with columns " + ", ".join(da.IMPORT_COLUMNS) +
+               ". SOURCE_TABLE is DATABASE.SCHEMA.TABLE and VALUE_TRANSLATIONS a JSON object such as {\"A\": \"Active\"}.")
+    importFile = st.file_uploader("Mapping File", type=["csv","parquet"], key="importFile")
+    if importFile:
+        importRows, importValues, importErrors = da.validate_import(da.read_import_file(importFile))
+        if not importErrors.empty:
+            st.error(f"{importErrors['ROW'].nunique()} of {len(importRows)} rows failed validation. Fix the file and upload it again.")
+            st.dataframe(importErrors, use_container_width=True, hide_index=True)
+        else:
+            st.info(f"{len(importRows)} columns across {importRows['TABLE_ID'].nunique()} tables and {len(importValues)} value translations are ready to import.")
+            if st.button('Import Mappings', key="importBtn"):
+                try:
+                    with st.spinner("Importing mappings..."):
+                        counts = da.import_mappings(importRows, importValues)
+                    st.success(f"Created {counts['mappings']} mappings, added {counts['columns_inserted']} and updated {counts['columns_updated']} columns, loaded {counts['values']} value translations.")
+                except Exception as e:
+                    # The import runs in one transaction, so nothing was written
+                    st.error(f"Import failed and was rolled back: {e}")
+
 # This container holds the main tabs for mapping configuration.
 with st.container(border=True,key="mainContainer"):
     
@@ -245,7 +289,9 @@ with st.container(border=True,key="mainContainer"):
                 targetDB = st.text_input("Target Database",selectedMapping["TARGETDB"])
                 targetSchema = st.text_input("Target Schema",selectedMapping["TARGETSCHEMA"])
                 targetObject = st.text_input("Target Object Name",selectedMapping["TARGETOBJECT"])
-                targetObjectType = st.selectbox("Target Object Type",("View","Dynamic Table"),)
+                targetTypes = ("View","Dynamic Table")
+                targetObjectType = st.selectbox("Target Object Type",targetTypes,
+                                                index=targetTypes.index(selectedMapping["TARGETTYPE"]) if selectedMapping["TARGETTYPE"] in targetTypes else 0)
                 trySave = st.form_submit_button("Save");
                 if trySave:
                     success = da.save_mapping_master(selectedMappingID, targetDB, targetSchema, targetObject, targetObjectType)
@@ -279,8 +325,9 @@ with st.container(border=True,key="mainContainer"):
                 with col2:
                     submitted = st.form_submit_button("Save")
                     if submitted:
-                        da.save_columns(colEditor, selectedMappingID)
-                        st.success("Column mappings saved successfully!")
+                        # Send only the editor delta; it is applied in one transaction
+                        counts = da.save_columns(colEditor, selectedMappingID, st.session_state['ed'], columnMappings)
+                        st.success(f"Column mappings saved: {counts['inserted']} added, {counts['updated']} updated, {counts['deleted']} removed.")
     
                 
                 with col3:
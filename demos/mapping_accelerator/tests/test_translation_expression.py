@@ -0,0 +1,57 @@
+import importlib
+import os
+import sys
+
+import pytest
+
+pytest.importorskip("streamlit")
+snowpark = pytest.importorskip("snowflake.snowpark")
+import snowflake.snowpark.context
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+# Column type -> (source values, translations keyed by the value's string form, expected output)
+CASES = {
+    "NUMBER(10,2)": (["1.50", "2.00", "3.25"],
+                     [("1.50", "one and a half"), ("2.00", None), ("9.99", "unused")],
+                     [("1.50", "one and a half"), ("2.00", "2.00"), ("3.25", "3.25")]),
+    "FLOAT": (["1.5", "2", "3.25"],
+              [("1.5", "one and a half"), ("2", None), ("9.99", "unused")],
+              [("1.5", "one and a half"), ("2", "2"), ("3.25", "3.25")]),
+    "DATE": (["2024-01-31", "2024-02-01"],
+             [("2024-01-31", "month end"), ("2024-02-01", None)],
+             [("2024-01-31", "month end"), ("2024-02-01", "2024-02-01")]),
+    "VARCHAR": (["A", "B", "C"],
+                [("A", "alpha"), ("B", None), ("A", "shadowed")],
+                [("A", "alpha"), ("B", "B"), ("C", "C")]),
+}
+
+
+@pytest.fixture(scope="module")
+def da():
+    # data_access binds the active session at import; outside Snowflake use the configured connection
+    try:
+        session = snowpark.Session.builder.getOrCreate()
+    except Exception as e:
+        pytest.skip(f"no Snowflake connection: {e}")
+    snowflake.snowpark.context.get_active_session = lambda: session
+    module = importlib.import_module("data_access")
+    yield module
+    session.close()
+
+
+def _translate(da, column_type, values, pairs, lookup_threshold):
+    expression = da.translation_expression("SRC", "DST", pairs, lookup_threshold)
+    rows = " UNION ALL ".join(f"SELECT {da.sql_literal(v)}::{column_type} AS SRC" for v in values)
+    result = da.session.sql(f"SELECT SRC::STRING AS SRC_TEXT, {expression} FROM ({rows}) ORDER BY 1").collect()
+    return [(r["SRC_TEXT"], r["DST"]) for r in result]
+
+
+@pytest.mark.parametrize("column_type", list(CASES))
+def test_case_and_lookup_forms_agree(da, column_type):
+    values, pairs, expected = CASES[column_type]
+    case_form = _translate(da, column_type, values, pairs, lookup_threshold=len(pairs))
+    lookup_form = _translate(da, column_type, values, pairs, lookup_threshold=0)
+    # First translation wins and a NULL translation keeps the source value, in both forms
+    assert case_form == expected
+    assert lookup_form == expected
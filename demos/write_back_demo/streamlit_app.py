@@ -1,7 +1,8 @@
 import streamlit as st
 import pandas as pd
 from snowflake.snowpark.context import get_active_session
-import re
+import json
+import uuid
 import altair as alt
 
 
@@ -22,11 +23,38 @@ st.markdown(
 st.markdown("<div class='app-title'>Reference Table Write-back Demo</div>", unsafe_allow_html=True)
 
 
+# Columns the editor can sort by (whitelist; the choice is interpolated into ORDER BY)
+SORT_COLUMNS = ["LAST_NAME", "FIRST_NAME", "EMAIL", "DEPARTMENT", "TITLE", "LOCATION", "HIRE_DATE"]
+PAGE_SIZES = [50, 100, 250, 500]
+
+# Server-side search over the columns people usually look employees up by
+SEARCH_FILTER = """
+        IS_CURRENT = TRUE
+        AND (? = ''
+             OR CONCAT_WS(' ', FIRST_NAME, LAST_NAME, EMAIL, COALESCE(DEPARTMENT, ''), COALESCE(TITLE, ''), COALESCE(LOCATION, ''))
+                ILIKE '%' || ? || '%')
+"""
+
+
+@st.cache_data(show_spinner=False)
+def count_employees(search: str = "") -> int:
+    session = get_active_session()
+    rows = session.sql(
+        f"SELECT COUNT(*) AS N FROM HRDEMO.EMPLOYEES WHERE {SEARCH_FILTER}", params=[search, search]
+    ).collect()
+    return int(rows[0]["N"]) if rows else 0
+
+
 @st.cache_data(show_spinner=False)
-def load_employees() -> pd.DataFrame:
+def load_employees(search: str = "", sort_by: str = "LAST_NAME", descending: bool = False,
+                   page: int = 1, page_size: int = 100) -> pd.DataFrame:
+    # Only the visible window is loaded; filter, sort and paging run in Snowflake
     session = get_active_session()
+    sort_by = sort_by if sort_by in SORT_COLUMNS else "LAST_NAME"
+    direction = "DESC" if descending else "ASC"
+    offset = (max(int(page), 1) - 1) * int(page_size)
     df = session.sql(
-        """
+        f"""
         SELECT EMPLOYEE_ID,
                FIRST_NAME,
                LAST_NAME,
@@ -44,9 +72,11 @@ def load_employees() -> pd.DataFrame:
                VERSION_NUMBER,
                IS_CURRENT
         FROM HRDEMO.EMPLOYEES
-        WHERE IS_CURRENT = TRUE
-        ORDER BY LAST_NAME, FIRST_NAME
-        """
+        WHERE {SEARCH_FILTER}
+        ORDER BY {sort_by} {direction} NULLS LAST, EMPLOYEE_ID
+        LIMIT {int(page_size)} OFFSET {offset}
+        """,
+        params=[search, search],
     ).to_pandas()
     # Normalize dtypes for editing
     text_cols = [
@@ -80,236 +110,353 @@ def load_employees() -> pd.DataFrame:
                 df[meta] = df[meta].astype("boolean").fillna(True)
             else:
                 df[meta] = df[meta].astype("string").fillna("")
+    # Fingerprint of the editable values as loaded, used to detect real changes on save
+    df["ROW_HASH"] = row_hash(df)
     return df
 
 
+@st.cache_data(show_spinner=False)
+def load_insights() -> tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+    # Aggregates over all current employees, computed in Snowflake and cached apart from the editor window
+    session = get_active_session()
+    metrics_df = session.sql(
+        """
+        SELECT COUNT(*) AS CURRENT_COUNT,
+               COUNT_IF(ACTIVE) AS ACTIVE_COUNT,
+               COUNT(DISTINCT COALESCE(LOCATION, '')) AS LOCATION_COUNT
+        FROM HRDEMO.EMPLOYEES
+        WHERE IS_CURRENT = TRUE
+        """
+    ).to_pandas()
+    loc_df = session.sql(
+        """
+        SELECT COALESCE(NULLIF(TRIM(LOCATION), ''), '(Unknown)') AS LOCATION, COUNT(*) AS "Count"
+        FROM HRDEMO.EMPLOYEES
+        WHERE IS_CURRENT = TRUE
+        GROUP BY 1
+        """
+    ).to_pandas()
+    skill_counts = session.sql(
+        """
+        SELECT TRIM(s.VALUE) AS "Skill", COUNT(*) AS "Count"
+        FROM HRDEMO.EMPLOYEES e,
+             TABLE(SPLIT_TO_TABLE(e.SKILLS, ',')) s
+        WHERE e.IS_CURRENT = TRUE AND TRIM(s.VALUE) <> ''
+        GROUP BY 1
+        ORDER BY 2 DESC
+        """
+    ).to_pandas()
+    return metrics_df, loc_df, skill_counts
+
+
 def refresh_data():
     load_employees.clear()
+    count_employees.clear()
 
 
-def validate_rows(df: pd.DataFrame) -> list[str]:
-    errors: list[str] = []
-    email_set: set[str] = set()
-    email_regex = re.compile(r"^[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}$")
-    url_regex = re.compile(r"^https?://[\w.-]+(?:/[\w\-./?%&=]*)?$")
-    for idx, row in df.iterrows():
-        first = str(row.get("FIRST_NAME", "")).strip()
-        last = str(row.get("LAST_NAME", "")).strip()
-        email = str(row.get("EMAIL", "")).strip().lower()
-        resume_url = str(row.get("RESUME_URL", "")).strip()
-        skills = str(row.get("SKILLS", "")).strip()
-        if not first:
-            errors.append(f"Row {idx + 1}: FIRST_NAME is required")
-        if not last:
-            errors.append(f"Row {idx + 1}: LAST_NAME is required")
-        if not email:
-            errors.append(f"Row {idx + 1}: EMAIL is required")
-        elif not email_regex.match(email):
-            errors.append(f"Row {idx + 1}: EMAIL '{email}' is invalid")
-        elif email in email_set:
-            errors.append(f"Row {idx + 1}: duplicate EMAIL '{email}' in editor")
-        else:
-            email_set.add(email)
-        if resume_url and not url_regex.match(resume_url):
-            errors.append(f"Row {idx + 1}: RESUME_URL must be a valid http(s) URL")
-        if len(skills) > 500:
-            errors.append(f"Row {idx + 1}: SKILLS exceeds 500 characters")
-    return errors
+def refresh_insights():
+    # Only after a commit (or an explicit Refresh); paging and editing leave the aggregates cached
+    load_insights.clear()
+
 
+# Declarative validation rules; the same engine works for any reference table
+EMPLOYEE_RULES = [
+    {"column": "FIRST_NAME", "rule": "required"},
+    {"column": "LAST_NAME", "rule": "required"},
+    {"column": "EMAIL", "rule": "required"},
+    {"column": "EMAIL", "rule": "regex", "lower": True,
+     "pattern": r"[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Za-z]{2,}", "message": "EMAIL '{value}' is invalid"},
+    {"column": "EMAIL", "rule": "unique", "lower": True},
+    {"column": "RESUME_URL", "rule": "regex",
+     "pattern": r"https?://[\w.-]+(?:/[\w\-./?%&=]*)?", "message": "RESUME_URL must be a valid http(s) URL"},
+    {"column": "SKILLS", "rule": "max_length", "max": 500},
+]
 
-def perform_writeback(original_df: pd.DataFrame, edited_df: pd.DataFrame) -> tuple[int, int, int]:
+
+def rule_values(df: pd.DataFrame, rule: dict) -> pd.Series:
+    values = df.reindex(columns=[rule["column"]])[rule["column"]].astype("string").fillna("").str.strip()
+    return values.str.lower() if rule.get("lower") else values
+
+
+def find_existing_values(table: str, key_column: str, column: str, values: list[str], lower: bool,
+                         current_filter: str, exclude_keys: set) -> set[str]:
+    # One bound probe for all candidate values against every current row in the table
+    if not values:
+        return set()
     session = get_active_session()
+    expr = f"LOWER(TRIM({column}))" if lower else f"TRIM({column})"
+    rows = session.sql(
+        f"""
+        SELECT {key_column} AS KEY, {expr} AS VALUE
+        FROM {table}
+        WHERE {current_filter}
+          AND {expr} IN (SELECT VALUE::STRING FROM TABLE(FLATTEN(INPUT => PARSE_JSON(?))))
+        """,
+        params=[json.dumps(values)],
+    ).collect()
+    return {r["VALUE"] for r in rows if r["KEY"] not in exclude_keys}
+
+
+def validate_rows(df: pd.DataFrame, rules: list[dict] = EMPLOYEE_RULES, changed: pd.DataFrame | None = None,
+                  table: str = "HRDEMO.EMPLOYEES", key_column: str = "EMPLOYEE_ID",
+                  current_filter: str = "IS_CURRENT = TRUE", loaded_keys=None) -> list[str]:
+    df = df.reset_index(drop=True)
+    messages = {}  # row position -> messages, so output reads row by row
+    exclude_keys = set(loaded_keys) if loaded_keys is not None else set(df[key_column])
+
+    def flag(mask: pd.Series, values: pd.Series, message: str):
+        for pos in mask[mask].index:
+            messages.setdefault(pos, []).append(message.format(value=values[pos]))
+
+    for rule in rules:
+        column = rule["column"]
+        values = rule_values(df, rule)
+        if rule["rule"] == "required":
+            flag(values == "", values, rule.get("message", f"{column} is required"))
+        elif rule["rule"] == "regex":
+            flag((values != "") & ~values.str.fullmatch(rule["pattern"]).fillna(False), values,
+                 rule.get("message", f"{column} '{{value}}' is invalid"))
+        elif rule["rule"] == "max_length":
+            flag(values.str.len() > rule["max"], values,
+                 rule.get("message", f"{column} exceeds {rule['max']} characters"))
+        elif rule["rule"] == "unique":
+            flag((values != "") & values.duplicated(keep="first"), values, f"duplicate {column} '{{value}}' in editor")
+            # Only values on changed rows can collide with rows outside the editor
+            candidates = rule_values(changed, rule) if changed is not None else values
+            candidates = sorted(set(candidates[candidates != ""]))
+            taken = find_existing_values(table, key_column, column, candidates, rule.get("lower", False),
+                                         current_filter, exclude_keys)
+            flag(values.isin(taken), values, f"{column} '{{value}}' is already used by another current row")
+
+    return [f"Row {pos + 1}: {m}" for pos in sorted(messages) for m in messages[pos]]
+
+
+STAGE_COLUMNS = [
+    "EMPLOYEE_ID",
+    "FIRST_NAME",
+    "LAST_NAME",
+    "EMAIL",
+    "DEPARTMENT",
+    "FUNCTION",
+    "TITLE",
+    "LOCATION",
+    "MANAGER_EMAIL",
+    "HIRE_DATE",
+    "ACTIVE",
+    "SKILLS",
+    "RESUME_URL",
+]
+
+# Staged column list in EMPLOYEES insert order (after the versioning columns)
+STAGE_VALUES = (
+    's."FIRST_NAME", s."LAST_NAME", s."EMAIL", s."DEPARTMENT", s."FUNCTION", s."TITLE", s."LOCATION", '
+    's."MANAGER_EMAIL", TO_DATE(s."HIRE_DATE"), s."ACTIVE", s."SKILLS", s."RESUME_URL"'
+)
 
-    # Normalize
-    def norm(df: pd.DataFrame) -> pd.DataFrame:
-        out = df.copy()
-        text_cols = [
-            "EMPLOYEE_ID",
-            "FIRST_NAME",
-            "LAST_NAME",
-            "EMAIL",
-            "DEPARTMENT",
-            "FUNCTION",
-            "TITLE",
-            "LOCATION",
-            "MANAGER_EMAIL",
-            "SKILLS",
-            "RESUME_URL",
-        ]
-        for c in text_cols:
-            if c in out.columns:
-                out[c] = out[c].astype("string").fillna("")
-        if "ACTIVE" in out.columns:
-            out["ACTIVE"] = out["ACTIVE"].astype("boolean").fillna(True)
-        if "HIRE_DATE" in out.columns:
-            out["HIRE_DATE"] = pd.to_datetime(out["HIRE_DATE"], errors="coerce")
-        return out
-
-    original_df = norm(original_df)
-    edited_df = norm(edited_df)
-
-    orig_by_id = {r["EMPLOYEE_ID"]: r for r in original_df.to_dict("records")}
-    edited_records = edited_df.to_dict("records")
-
-    edited_ids = {r["EMPLOYEE_ID"] for r in edited_records if r.get("EMPLOYEE_ID")}
-    delete_ids = [rid for rid in orig_by_id.keys() if rid and rid not in edited_ids]
-
-    updates: list[dict] = []
-    inserts: list[dict] = []
-
-    def normalize_email(e: str) -> str:
-        return (e or "").strip().lower()
-
-    for rec in edited_records:
-        eid = rec.get("EMPLOYEE_ID", "")
-        if eid and eid in orig_by_id:
-            before = orig_by_id[eid]
-            changed = False
-            fields = [
-                "FIRST_NAME",
-                "LAST_NAME",
-                "EMAIL",
-                "DEPARTMENT",
-                "FUNCTION",
-                "TITLE",
-                "LOCATION",
-                "MANAGER_EMAIL",
-                "SKILLS",
-                "RESUME_URL",
-            ]
-            for f in fields:
-                if str(rec.get(f, "")).strip() != str(before.get(f, "")).strip():
-                    changed = True
-                    break
-            if not changed:
-                # Compare date and boolean
-                if pd.to_datetime(rec.get("HIRE_DATE")) != pd.to_datetime(before.get("HIRE_DATE")):
-                    changed = True
-                if bool(rec.get("ACTIVE")) != bool(before.get("ACTIVE")):
-                    changed = True
-            if changed:
-                updates.append(rec)
-        else:
-            # New row when no EMPLOYEE_ID
-            if rec.get("FIRST_NAME") or rec.get("LAST_NAME") or rec.get("EMAIL"):
-                inserts.append(rec)
 
-    deleted = 0
-    updated = 0
-    inserted = 0
+def stage_frame(df: pd.DataFrame, op: str) -> pd.DataFrame:
+    # Clean the rows for one operation into the shape of the staging table
+    out = df.reindex(columns=STAGE_COLUMNS).copy()
+    text_cols = [c for c in STAGE_COLUMNS if c not in ("HIRE_DATE", "ACTIVE")]
+    for c in text_cols:
+        out[c] = out[c].astype("string").fillna("").str.strip()
+    for c in ["EMAIL", "MANAGER_EMAIL"]:
+        out[c] = out[c].str.lower()
+    hire = pd.to_datetime(out["HIRE_DATE"], errors="coerce")
+    out["HIRE_DATE"] = hire.dt.strftime("%Y-%m-%d").astype(object).where(hire.notna(), None)
+    out["ACTIVE"] = out["ACTIVE"].astype("boolean").fillna(True).astype(bool)
+    out = out.astype({c: object for c in text_cols})
+    # Version the row was loaded at; saves only apply while it is still the current one
+    out["EMPLOYEE_UID"] = df.reindex(columns=["EMPLOYEE_UID"])["EMPLOYEE_UID"].astype("string").fillna("").astype(object)
+    version = pd.to_numeric(df.reindex(columns=["VERSION_NUMBER"])["VERSION_NUMBER"], errors="coerce")
+    out["VERSION_NUMBER"] = version.astype(object).where(version.notna(), None)
+    out.insert(0, "OP", op)
+    return out
+
+
+def row_hash(df: pd.DataFrame) -> pd.Series:
+    # Hash of the editable values as they would be written, so cosmetic differences don't count as edits
+    values = stage_frame(df, "").drop(columns=["OP", "EMPLOYEE_ID", "EMPLOYEE_UID", "VERSION_NUMBER"])
+    return pd.util.hash_pandas_object(values, index=False)
+
+
+def detect_changes(original_df: pd.DataFrame, edited_df: pd.DataFrame, changes: dict | None = None):
+    # Returns (updated rows, inserted rows, deleted rows) as frames
+    if changes is not None:
+        # Editor delta: positions refer to rows of original_df
+        positions = sorted(int(p) for p in changes.get("edited_rows", {}))
+        updates = original_df.iloc[positions].copy()
+        for pos, values in changes.get("edited_rows", {}).items():
+            for col, value in values.items():
+                updates.loc[original_df.index[int(pos)], col] = value
+        inserts = pd.DataFrame(changes.get("added_rows", []), columns=original_df.columns)
+        deletes = original_df.iloc[sorted(int(p) for p in changes.get("deleted_rows", []))]
+    else:
+        # No delta available: compare row hashes by EMPLOYEE_ID
+        has_id = edited_df["EMPLOYEE_ID"].astype("string").fillna("").str.strip() != ""
+        updates = edited_df[has_id & edited_df["EMPLOYEE_ID"].isin(original_df["EMPLOYEE_ID"])]
+        inserts = edited_df[~has_id]
+        deletes = original_df[~original_df["EMPLOYEE_ID"].isin(edited_df.loc[has_id, "EMPLOYEE_ID"])]
+
+    # Edits that end up back at the loaded values are not changes
+    if not updates.empty:
+        loaded_hash = updates["EMPLOYEE_ID"].map(original_df.set_index("EMPLOYEE_ID")["ROW_HASH"])
+        updates = updates[row_hash(updates).to_numpy() != loaded_hash.to_numpy()]
+    if not inserts.empty:
+        content = inserts.reindex(columns=["FIRST_NAME", "LAST_NAME", "EMAIL"]).astype("string").fillna("").apply(lambda c: c.str.strip())
+        inserts = inserts[(content != "").any(axis=1)]
+    return updates, inserts, deletes
+
+
+def perform_writeback(original_df: pd.DataFrame, edited_df: pd.DataFrame,
+                      changes: dict | None = None) -> tuple[int, int, int, pd.DataFrame]:
+    session = get_active_session()
+    updates, inserts, deletes = detect_changes(original_df, edited_df, changes)
+
+    # Stage every change once; the transaction then only runs set-based statements
+    staged = [
+        stage_frame(frame, op)
+        for frame, op in ((updates, "UPDATE"), (inserts, "INSERT"), (deletes, "DELETE"))
+        if not frame.empty
+    ]
+    if not staged:
+        return 0, 0, 0, pd.DataFrame()
+    stage_df = pd.concat(staged, ignore_index=True)
+    # The version a row was loaded at comes from the loaded frame, never from editor values
+    loaded = original_df.set_index("EMPLOYEE_ID")
+    versioned = stage_df["OP"].isin(["UPDATE", "DELETE"])
+    stage_df.loc[versioned, "EMPLOYEE_UID"] = stage_df.loc[versioned, "EMPLOYEE_ID"].map(loaded["EMPLOYEE_UID"]).astype(object)
+    stage_df.loc[versioned, "VERSION_NUMBER"] = stage_df.loc[versioned, "EMPLOYEE_ID"].map(loaded["VERSION_NUMBER"]).astype(object)
+    stage_name = f"EMPLOYEES_STAGE_{uuid.uuid4().hex[:12].upper()}"
+    session.write_pandas(stage_df, stage_name, schema="HRDEMO", auto_create_table=True, table_type="temporary", overwrite=True)
+    stage_table = f'HRDEMO."{stage_name}"'
+
+    # Staged update/delete whose loaded version is no longer the current one
+    stale = f"""
+        s."OP" IN ('UPDATE', 'DELETE')
+        AND NOT EXISTS (
+            SELECT 1 FROM HRDEMO.EMPLOYEES e
+             WHERE e.EMPLOYEE_ID = s."EMPLOYEE_ID" AND e.EMPLOYEE_UID = s."EMPLOYEE_UID"
+               AND e.VERSION_NUMBER = s."VERSION_NUMBER" AND e.IS_CURRENT = TRUE)
+    """
 
     session.sql("BEGIN").collect()
     try:
-        # Soft-delete (archive) by marking previous current row as not current
-        for rid in delete_ids:
-            session.sql(
-                f"UPDATE HRDEMO.EMPLOYEES SET IS_CURRENT = FALSE, UPDATE_USER = CURRENT_USER(), UPDATE_DATE_TIME = CURRENT_TIMESTAMP() WHERE EMPLOYEE_ID = '{rid}'"
-            ).collect()
-            deleted += 1
-
-        for rec in updates:
-            # Create a new version row; mark old as not current
-            eid = str(rec.get("EMPLOYEE_ID", "")).replace("'", "''")
-            def q(x: str) -> str:
-                return (str(x or "").strip()).replace("'", "''")
-            first = q(rec.get("FIRST_NAME"))
-            last = q(rec.get("LAST_NAME"))
-            email = q(normalize_email(rec.get("EMAIL")))
-            dept = q(rec.get("DEPARTMENT"))
-            func = q(rec.get("FUNCTION"))
-            title = q(rec.get("TITLE"))
-            loc = q(rec.get("LOCATION"))
-            mgr = q(normalize_email(rec.get("MANAGER_EMAIL")))
-            skills = q(rec.get("SKILLS"))
-            resume = q(rec.get("RESUME_URL"))
-            hire = rec.get("HIRE_DATE")
-            hire_str = pd.to_datetime(hire).strftime("%Y-%m-%d") if pd.notna(hire) else None
-            active_val = "TRUE" if bool(rec.get("ACTIVE")) else "FALSE"
-            # Determine versioning metadata from original row
-            before = orig_by_id.get(rec.get("EMPLOYEE_ID"))
-            uid = q(before.get("EMPLOYEE_UID")) if before and before.get("EMPLOYEE_UID") else None
-            current_version = int(before.get("VERSION_NUMBER")) if before and before.get("VERSION_NUMBER") is not None else 1
-            next_version = current_version + 1
-
-            # Mark previous row as not current
-            session.sql(
-                f"UPDATE HRDEMO.EMPLOYEES SET IS_CURRENT = FALSE, UPDATE_USER = CURRENT_USER(), UPDATE_DATE_TIME = CURRENT_TIMESTAMP() WHERE EMPLOYEE_ID = '{eid}'"
-            ).collect()
-
-            # Insert new version row
-            if uid:
-                session.sql(
-                    f"""
-                    INSERT INTO HRDEMO.EMPLOYEES
-                        (EMPLOYEE_UID, VERSION_NUMBER, IS_CURRENT,
-                         FIRST_NAME, LAST_NAME, EMAIL, DEPARTMENT, FUNCTION, TITLE, LOCATION, MANAGER_EMAIL, HIRE_DATE, ACTIVE,
-                         SKILLS, RESUME_URL)
-                    VALUES
-                        ('{uid}', {next_version}, TRUE,
-                         '{first}', '{last}', '{email}', '{dept}', '{func}', '{title}', '{loc}', '{mgr}', {f"TO_DATE('{hire_str}')" if hire_str else 'NULL'}, {active_val},
-                         '{skills}', '{resume}')
-                    """
-                ).collect()
-            else:
-                # Fallback: let EMPLOYEE_UID default if not present
-                session.sql(
-                    f"""
-                    INSERT INTO HRDEMO.EMPLOYEES
-                        (VERSION_NUMBER, IS_CURRENT,
-                         FIRST_NAME, LAST_NAME, EMAIL, DEPARTMENT, FUNCTION, TITLE, LOCATION, MANAGER_EMAIL, HIRE_DATE, ACTIVE,
-                         SKILLS, RESUME_URL)
-                    VALUES
-                        ({next_version}, TRUE,
-                         '{first}', '{last}', '{email}', '{dept}', '{func}', '{title}', '{loc}', '{mgr}', {f"TO_DATE('{hire_str}')" if hire_str else 'NULL'}, {active_val},
-                         '{skills}', '{resume}')
-                    """
-                ).collect()
-            updated += 1
-
-        for rec in inserts:
-            def q(x: str) -> str:
-                return (str(x or "").strip()).replace("'", "''")
-            first = q(rec.get("FIRST_NAME"))
-            last = q(rec.get("LAST_NAME"))
-            email = q(normalize_email(rec.get("EMAIL")))
-            dept = q(rec.get("DEPARTMENT"))
-            func = q(rec.get("FUNCTION"))
-            title = q(rec.get("TITLE"))
-            loc = q(rec.get("LOCATION"))
-            mgr = q(normalize_email(rec.get("MANAGER_EMAIL")))
-            skills = q(rec.get("SKILLS"))
-            resume = q(rec.get("RESUME_URL"))
-            hire = rec.get("HIRE_DATE")
-            hire_str = pd.to_datetime(hire).strftime("%Y-%m-%d") if pd.notna(hire) else None
-            active_val = "TRUE" if bool(rec.get("ACTIVE", True)) else "FALSE"
-            session.sql(
-                f"""
-                INSERT INTO HRDEMO.EMPLOYEES
-                    (VERSION_NUMBER, IS_CURRENT,
-                     FIRST_NAME, LAST_NAME, EMAIL, DEPARTMENT, FUNCTION, TITLE, LOCATION, MANAGER_EMAIL, HIRE_DATE, ACTIVE,
-                     SKILLS, RESUME_URL)
-                VALUES
-                    (1, TRUE,
-                     '{first}', '{last}', '{email}', '{dept}', '{func}', '{title}', '{loc}', '{mgr}', {f"TO_DATE('{hire_str}')" if hire_str else 'NULL'}, {active_val},
-                     '{skills}', '{resume}')
-                """
-            ).collect()
-            inserted += 1
+        # Report conflicting rows with whoever changed them, then leave them out of the save
+        conflicts = session.sql(
+            f"""
+            SELECT s."EMPLOYEE_ID", s."OP", s."FIRST_NAME", s."LAST_NAME",
+                   s."VERSION_NUMBER" AS LOADED_VERSION,
+                   c.VERSION_NUMBER AS CURRENT_VERSION,
+                   IFF(c.EMPLOYEE_ID IS NULL, 'Archived', 'Modified') AS CONFLICT,
+                   COALESCE(c.UPDATE_USER, c.INSERT_USER) AS CHANGED_BY,
+                   COALESCE(c.UPDATE_DATE_TIME, c.INSERT_DATE_TIME) AS CHANGED_AT
+              FROM {stage_table} s
+              LEFT JOIN HRDEMO.EMPLOYEES c ON c.EMPLOYEE_UID = s."EMPLOYEE_UID" AND c.IS_CURRENT = TRUE
+             WHERE {stale}
+            """
+        ).to_pandas()
+        if not conflicts.empty:
+            session.sql(f"DELETE FROM {stage_table} s WHERE {stale}").collect()
+
+        # Close the loaded version of every updated or deleted employee, only if it is still current
+        closed = session.sql(
+            f"""
+            UPDATE HRDEMO.EMPLOYEES e
+               SET IS_CURRENT = FALSE,
+                   UPDATE_USER = CURRENT_USER(),
+                   UPDATE_DATE_TIME = CURRENT_TIMESTAMP()
+              FROM {stage_table} s
+             WHERE e.EMPLOYEE_ID = s."EMPLOYEE_ID" AND e.EMPLOYEE_UID = s."EMPLOYEE_UID"
+               AND e.VERSION_NUMBER = s."VERSION_NUMBER" AND s."OP" IN ('UPDATE', 'DELETE') AND e.IS_CURRENT = TRUE
+            """
+        ).collect()
+        # Anything else changing between the conflict check and the close is a race; start over
+        expected = int(versioned.sum()) - len(conflicts)
+        closed_count = int(closed[0][0]) if closed else 0
+        if closed_count != expected:
+            raise RuntimeError(
+                f"{expected - closed_count} of {expected} edited rows were changed by someone else while saving. "
+                "Refresh and reapply your edits."
+            )
+
+        # New versions carry the employee's UID forward with the next version number
+        session.sql(
+            f"""
+            INSERT INTO HRDEMO.EMPLOYEES
+                (EMPLOYEE_UID, VERSION_NUMBER, IS_CURRENT,
+                 FIRST_NAME, LAST_NAME, EMAIL, DEPARTMENT, FUNCTION, TITLE, LOCATION, MANAGER_EMAIL, HIRE_DATE, ACTIVE,
+                 SKILLS, RESUME_URL)
+            SELECT e.EMPLOYEE_UID, e.VERSION_NUMBER + 1, TRUE,
+                   {STAGE_VALUES}
+              FROM {stage_table} s
+              JOIN HRDEMO.EMPLOYEES e ON e.EMPLOYEE_ID = s."EMPLOYEE_ID"
+             WHERE s."OP" = 'UPDATE'
+            """
+        ).collect()
+
+        # Brand new employees start at version 1 with a fresh UID
+        session.sql(
+            f"""
+            INSERT INTO HRDEMO.EMPLOYEES
+                (VERSION_NUMBER, IS_CURRENT,
+                 FIRST_NAME, LAST_NAME, EMAIL, DEPARTMENT, FUNCTION, TITLE, LOCATION, MANAGER_EMAIL, HIRE_DATE, ACTIVE,
+                 SKILLS, RESUME_URL)
+            SELECT 1, TRUE,
+                   {STAGE_VALUES}
+              FROM {stage_table} s
+             WHERE s."OP" = 'INSERT'
+            """
+        ).collect()
 
         session.sql("COMMIT").collect()
     except Exception:
         session.sql("ROLLBACK").collect()
         raise
+    finally:
+        session.sql(f"DROP TABLE IF EXISTS {stage_table}").collect()
 
-    return deleted, updated, inserted
+    applied = stage_df[~stage_df["EMPLOYEE_ID"].isin(conflicts.get("EMPLOYEE_ID", pd.Series(dtype=object))) | ~versioned]
+    counts = applied["OP"].value_counts()
+    deleted = int(counts.get("DELETE", 0))
+    updated = int(counts.get("UPDATE", 0))
+    inserted = int(counts.get("INSERT", 0))
+    return deleted, updated, inserted, conflicts
 
 
 with st.container(border=True):
     st.subheader("Employees")
-    src_df = load_employees()
 
-    st.caption("Add, edit, or delete employees. EMAIL must be unique and valid.")
+    # Window controls: only the selected page is loaded and edited
+    f1, f2, f3, f4 = st.columns([3, 2, 1, 1])
+    with f1:
+        search = st.text_input("Search", placeholder="Name, email, department, title or location", key="emp_search")
+    with f2:
+        sort_by = st.selectbox("Sort by", SORT_COLUMNS, key="emp_sort")
+    with f3:
+        descending = st.toggle("Descending", key="emp_desc")
+    with f4:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=1, key="emp_page_size")
+    total_rows = count_employees(search)
+    total_pages = max(1, -(-total_rows // page_size))
+    if st.session_state.get("emp_page", 1) > total_pages:
+        # The search narrowed the result; stay on its last page
+        st.session_state["emp_page"] = total_pages
+    page = st.number_input("Page", min_value=1, max_value=total_pages, step=1, key="emp_page")
+    src_df = load_employees(search, sort_by, descending, int(page), int(page_size))
+    first_row = (int(page) - 1) * page_size + 1 if total_rows else 0
+    st.caption(
+        f"Showing {first_row}-{first_row + len(src_df) - 1 if total_rows else 0} of {total_rows} current employees. "
+        "Add, edit, or delete employees. EMAIL must be unique and valid. Save before changing page."
+    )
 
+    conflicts = st.session_state.pop("writeback_conflicts", None)
+    if conflicts is not None and not conflicts.empty:
+        st.warning(f"{len(conflicts)} row(s) were changed by someone else since you loaded them and were not saved. Review and reapply:")
+        st.dataframe(conflicts, use_container_width=True, hide_index=True)
+
+    # A new window gets its own editor state, so positional edits never apply to another page
+    editor_key = f"employees_editor_{search}_{sort_by}_{descending}_{int(page)}_{page_size}"
     edited_df = st.data_editor(
         src_df,
         num_rows="dynamic",
@@ -329,21 +476,35 @@ with st.container(border=True):
             "ACTIVE": st.column_config.CheckboxColumn("ACTIVE", default=True),
             "SKILLS": st.column_config.Column("SKILLS", help="Comma-separated skills like: SQL, Python, Snowflake"),
             "RESUME_URL": st.column_config.LinkColumn("RESUME_URL", help="http(s) URL to resume"),
+            "ROW_HASH": None,
+            "EMPLOYEE_UID": None,
+            "VERSION_NUMBER": st.column_config.NumberColumn("VERSION", disabled=True),
+            "IS_CURRENT": None,
         },
-        key="employees_editor",
+        key=editor_key,
     )
 
     col_a, col_b = st.columns([1, 3])
     with col_a:
         if st.button("Save changes", type="primary"):
-            errors = validate_rows(edited_df)
+            # An untouched editor still leaves an empty delta in session state; fall back to row hashes then
+            delta = st.session_state.get(editor_key) or {}
+            has_edits = any(delta.get(k) for k in ("edited_rows", "added_rows", "deleted_rows"))
+            pending = delta if has_edits else None
+            updates, inserts, _ = detect_changes(src_df, edited_df, pending)
+            changed = [frame for frame in (updates, inserts) if not frame.empty]
+            changed = pd.concat(changed) if changed else updates
+            errors = validate_rows(edited_df, changed=changed, loaded_keys=src_df["EMPLOYEE_ID"])
             if errors:
                 st.error("\n".join(errors))
             else:
                 with st.spinner("Writing changes..."):
                     try:
-                        deleted, updated, inserted = perform_writeback(src_df, edited_df)
+                        deleted, updated, inserted, conflicts = perform_writeback(src_df, edited_df, pending)
+                        st.session_state["writeback_conflicts"] = conflicts
                         refresh_data()
+                        if deleted or updated or inserted:
+                            refresh_insights()
                         st.success(
                             f"Done. Deleted: {deleted} • Updated: {updated} • Inserted: {inserted}"
                         )
@@ -354,6 +515,7 @@ with st.container(border=True):
     with col_b:
         if st.button("Refresh"):
             refresh_data()
+            refresh_insights()
             st.rerun()
 
     # Explicit delete control (soft delete: mark as not current)
@@ -373,20 +535,41 @@ with st.container(border=True):
                 if st.button("Delete selected", type="secondary"):
                     try:
                         session = get_active_session()
-                        eid = str(to_delete.get("EMPLOYEE_ID", "")).replace("'", "''")
-                        session.sql(
-                            f"""
+                        eid = str(to_delete.get("EMPLOYEE_ID", ""))
+                        uid = str(to_delete.get("EMPLOYEE_UID", ""))
+                        version = int(to_delete.get("VERSION_NUMBER", 1))
+                        # Archive only the version that was loaded, as perform_writeback closes rows
+                        archived = session.sql(
+                            """
                             UPDATE HRDEMO.EMPLOYEES
                                SET IS_CURRENT = FALSE,
                                    DELETE_USER = CURRENT_USER(),
                                    DELETE_DATE_TIME = CURRENT_TIMESTAMP(),
                                    UPDATE_USER = CURRENT_USER(),
                                    UPDATE_DATE_TIME = CURRENT_TIMESTAMP()
-                             WHERE EMPLOYEE_ID = '{eid}' AND IS_CURRENT = TRUE
-                            """
+                             WHERE EMPLOYEE_ID = ? AND EMPLOYEE_UID = ? AND VERSION_NUMBER = ? AND IS_CURRENT = TRUE
+                            """,
+                            params=[eid, uid, version],
                         ).collect()
-                        st.success("Employee archived (no longer current).")
                         refresh_data()
+                        if archived and int(archived[0][0]) > 0:
+                            refresh_insights()
+                            st.success("Employee archived (no longer current).")
+                        else:
+                            # Someone else changed or archived the row since it was loaded
+                            st.session_state["writeback_conflicts"] = session.sql(
+                                """
+                                SELECT ? AS EMPLOYEE_ID, 'DELETE' AS OP, ? AS FIRST_NAME, ? AS LAST_NAME,
+                                       ? AS LOADED_VERSION,
+                                       c.VERSION_NUMBER AS CURRENT_VERSION,
+                                       IFF(c.EMPLOYEE_ID IS NULL, 'Archived', 'Modified') AS CONFLICT,
+                                       COALESCE(c.UPDATE_USER, c.INSERT_USER) AS CHANGED_BY,
+                                       COALESCE(c.UPDATE_DATE_TIME, c.INSERT_DATE_TIME) AS CHANGED_AT
+                                  FROM (SELECT 1) d
+                                  LEFT JOIN HRDEMO.EMPLOYEES c ON c.EMPLOYEE_UID = ? AND c.IS_CURRENT = TRUE
+                                """,
+                                params=[eid, str(to_delete.get("FIRST_NAME", "")), str(to_delete.get("LAST_NAME", "")), version, uid],
+                            ).to_pandas()
                         st.rerun()
                     except Exception as ex:
                         st.error(f"Failed to delete: {ex}")
@@ -397,24 +580,21 @@ with st.container(border=True):
     st.divider()
     with st.container(border=True):
         st.subheader("Insights")
-        if not src_df.empty:
+        metrics_df, loc_df, skill_counts = load_insights()
+        if not metrics_df.empty and int(metrics_df.iloc[0]["CURRENT_COUNT"]) > 0:
+            metrics = metrics_df.iloc[0]
             c1, c2, c3 = st.columns(3)
             with c1:
                 with st.container(border=True):
-                    st.metric("Employees (current)", len(src_df))
+                    st.metric("Employees (current)", int(metrics["CURRENT_COUNT"]))
             with c2:
                 with st.container(border=True):
-                    st.metric("Active", int(src_df["ACTIVE"].fillna(False).sum()))
+                    st.metric("Active", int(metrics["ACTIVE_COUNT"]))
             with c3:
                 with st.container(border=True):
-                    st.metric("Locations", src_df["LOCATION"].fillna("").nunique())
+                    st.metric("Locations", int(metrics["LOCATION_COUNT"]))
 
             # Employees per location (Altair bar chart)
-            loc_df = (
-                src_df.assign(LOCATION=src_df["LOCATION"].fillna("(Unknown)"))
-                      .groupby("LOCATION", as_index=False)["EMPLOYEE_ID"].count()
-                      .rename(columns={"EMPLOYEE_ID": "Count"})
-            )
             st.markdown("<h5 class='section-title'>Employees by Location</h5>", unsafe_allow_html=True)
             loc_chart = (
                 alt.Chart(loc_df)
@@ -430,16 +610,7 @@ with st.container(border=True):
             st.altair_chart(loc_chart, use_container_width=True)
 
             # Employees per skill (Altair bar chart)
-            skills_series = src_df["SKILLS"].dropna().astype(str).str.split(",")
-            exploded = skills_series.explode().str.strip().replace("", pd.NA).dropna()
-            if not exploded.empty:
-                skills_df = pd.DataFrame({"Skill": exploded.astype(str)})
-                skill_counts = (
-                    skills_df.groupby("Skill", as_index=False)
-                             .size()
-                             .rename(columns={"size": "Count"})
-                             .sort_values("Count", ascending=False)
-                )
+            if not skill_counts.empty:
                 st.markdown("<h5 class='section-title'>Employees by Skill</h5>", unsafe_allow_html=True)
                 skill_chart = (
                     alt.Chart(skill_counts)